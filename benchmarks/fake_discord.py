@@ -0,0 +1,427 @@
+"""Local stand-in for the Discord REST API and gateway.
+
+Serves a synthetic account (guilds, text channels and message histories)
+over HTTP and a websocket gateway on 127.0.0.1, with an optional per-request
+delay to model network latency. Only the endpoints the benchmarked tools use
+are implemented; anything else gets a 404 and is counted in unknown_routes.
+"""
+
+import json
+import asyncio
+import datetime
+from collections import Counter
+from aiohttp import web, WSMsgType
+
+DISCORD_EPOCH = 1420070400000
+# 2024-01-01T00:00:00Z
+BASE_MS = 1704067200000
+
+EVERYONE_PERMISSIONS = "2251799813685247"
+
+# Member names are built from these so prefix searches have varied hit counts
+NAME_PARTS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet"]
+
+
+def snowflake(ms: int, increment: int = 0) -> int:
+    return ((ms - DISCORD_EPOCH) << 22) | (increment & 0xFFF)
+
+
+def _timestamp(message_id: int) -> str:
+    ms = (message_id >> 22) + DISCORD_EPOCH
+    return datetime.datetime.fromtimestamp(ms / 1000, datetime.timezone.utc).isoformat()
+
+
+def _json(data, status: int = 200) -> web.Response:
+    # discord.py only decodes bodies whose content type is exactly application/json
+    return web.Response(
+        body=json.dumps(data).encode(), status=status, headers={"Content-Type": "application/json"}
+    )
+
+
+class FakeDiscord:
+    def __init__(
+        self,
+        guilds: int = 3,
+        channels: int = 5,
+        messages: int = 2000,
+        members: int = 5000,
+        latency_ms: float = 10.0,
+    ):
+        self.latency = latency_ms / 1000
+        self.user = self._user(snowflake(BASE_MS - 10**9), "bench")
+        self.authors = [self._user(snowflake(BASE_MS - 10**9, i + 1), f"author{i}") for i in range(8)]
+        self.guilds: list[dict] = []
+        # channel id -> messages, oldest first
+        self.messages: dict[int, list[dict]] = {}
+        self.channel_guild: dict[int, int] = {}
+        # guild id -> member payloads, only served through member queries
+        self.members: dict[int, list[dict]] = {}
+        self.sockets: set[web.WebSocketResponse] = set()
+        self.sequence = 0
+        self.next_ms = BASE_MS + messages * 60_000 + 1
+        self.requests: Counter = Counter()
+        self.unknown_routes: Counter = Counter()
+        self.url = ""
+        self.runner = None
+
+        for g in range(guilds):
+            guild_id = snowflake(BASE_MS - 10**8, g)
+            self.members[guild_id] = [self._member(g, i) for i in range(members)]
+            channel_payloads = []
+            for c in range(channels):
+                channel_id = snowflake(BASE_MS - 10**7, g * 100 + c)
+                self.channel_guild[channel_id] = guild_id
+                history = [
+                    self._message(
+                        snowflake(BASE_MS + i * 60_000, c),
+                        channel_id,
+                        guild_id,
+                        self.authors[i % len(self.authors)],
+                        f"message {i} in channel {c}" + (" needle" if i % 97 == 0 else ""),
+                    )
+                    for i in range(messages)
+                ]
+                self.messages[channel_id] = history
+                channel_payloads.append(
+                    {
+                        "id": str(channel_id),
+                        "type": 0,
+                        "name": f"channel-{c}",
+                        "position": c,
+                        "parent_id": None,
+                        "permission_overwrites": [],
+                        "topic": None,
+                        "nsfw": False,
+                        "rate_limit_per_user": 0,
+                        "last_message_id": history[-1]["id"] if history else None,
+                    }
+                )
+            self.guilds.append(
+                {
+                    "id": str(guild_id),
+                    "name": f"guild-{g}",
+                    "icon": None,
+                    "owner_id": self.user["id"],
+                    # Over 1000 members hides offline members, as on Discord, so
+                    # the client does not try to chunk the guild at startup
+                    "member_count": members + 1,
+                    "large": members > 250,
+                    "features": [],
+                    "emojis": [],
+                    "stickers": [],
+                    "premium_tier": 0,
+                    "joined_at": "2020-01-01T00:00:00+00:00",
+                    "roles": [
+                        {
+                            "id": str(guild_id),
+                            "name": "@everyone",
+                            "permissions": EVERYONE_PERMISSIONS,
+                            "position": 0,
+                            "color": 0,
+                            "hoist": False,
+                            "managed": False,
+                            "mentionable": False,
+                        },
+                        {
+                            "id": str(self._regular_role(g)),
+                            "name": "regular",
+                            "permissions": "0",
+                            "position": 1,
+                            "color": 0,
+                            "hoist": False,
+                            "managed": False,
+                            "mentionable": False,
+                        },
+                    ],
+                    "channels": channel_payloads,
+                    "threads": [],
+                }
+            )
+
+    @staticmethod
+    def _user(user_id: int, name: str) -> dict:
+        return {
+            "id": str(user_id),
+            "username": name,
+            "discriminator": "0",
+            "global_name": name.title(),
+            "avatar": None,
+            "bot": False,
+            "flags": 0,
+        }
+
+    def _member(self, guild_index: int, index: int) -> dict:
+        name = f"{NAME_PARTS[index % len(NAME_PARTS)]}{NAME_PARTS[index // len(NAME_PARTS) % len(NAME_PARTS)]}{index}"
+        return {
+            "user": self._user(snowflake(BASE_MS - 10**9, 100 + guild_index * 10**5 + index), name),
+            "nick": f"nick{index}" if index % 5 == 0 else None,
+            # Every third member has the guild's "regular" role
+            "roles": [str(self._regular_role(guild_index))] if index % 3 == 0 else [],
+            "joined_at": "2020-01-01T00:00:00+00:00",
+            "deaf": False,
+            "mute": False,
+            "flags": 0,
+        }
+
+    @staticmethod
+    def _regular_role(guild_index: int) -> int:
+        return snowflake(BASE_MS - 10**8, 1000 + guild_index)
+
+    def _query_members(self, guild_id: int, query: str, limit: int) -> list[dict]:
+        query = query.casefold()
+        found = []
+        for member in self.members.get(guild_id, []):
+            names = (member["user"]["username"], member["nick"] or "")
+            if any(name.casefold().startswith(query) for name in names):
+                found.append(member)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def _member_list_update(self, guild_id: int, channels: dict) -> dict:
+        members = self.members.get(guild_id, [])
+        ranges = sorted({tuple(r) for ranges in channels.values() for r in ranges})
+        return {
+            "guild_id": str(guild_id),
+            "id": "everyone",
+            "member_count": len(members) + 1,
+            "online_count": 0,
+            "groups": [{"id": "offline", "count": len(members)}],
+            "ops": [
+                {
+                    "op": "SYNC",
+                    "range": [start, end],
+                    "items": [{"member": member} for member in members[start : end + 1]],
+                }
+                for start, end in ranges
+            ],
+        }
+
+    @staticmethod
+    def _message(message_id: int, channel_id: int, guild_id: int, author: dict, content: str) -> dict:
+        return {
+            "id": str(message_id),
+            "channel_id": str(channel_id),
+            "guild_id": str(guild_id),
+            "author": author,
+            "content": content,
+            "timestamp": _timestamp(message_id),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": [],
+            "pinned": False,
+            "type": 0,
+            "flags": 0,
+        }
+
+    # Gateway
+
+    def _ready(self) -> tuple[dict, dict]:
+        ready = {
+            "v": 9,
+            "user": dict(self.user, verified=True, mfa_enabled=False, premium_type=0, email=None, phone=None),
+            "users": self.authors,
+            "guilds": json.loads(json.dumps(self.guilds)),
+            "merged_members": [
+                [
+                    {
+                        "user_id": self.user["id"],
+                        "roles": [],
+                        "joined_at": "2020-01-01T00:00:00+00:00",
+                        "deaf": False,
+                        "mute": False,
+                        "flags": 0,
+                    }
+                ]
+                for _ in self.guilds
+            ],
+            "private_channels": [],
+            "relationships": [],
+            "session_id": "benchmark-session",
+            "resume_gateway_url": self.url.replace("http", "ws", 1) + "/",
+            "analytics_token": "benchmark",
+            "country_code": "US",
+            "user_guild_settings": {"entries": []},
+            "sessions": [
+                {
+                    "session_id": "benchmark-session",
+                    "client_info": {"client": "web", "os": "windows", "version": 0},
+                    "status": "online",
+                    "activities": [],
+                    "active": True,
+                }
+            ],
+        }
+        supplemental = {
+            "guilds": [{"id": guild["id"], "voice_states": []} for guild in self.guilds],
+            "merged_members": [[] for _ in self.guilds],
+            "merged_presences": {"guilds": [[] for _ in self.guilds], "friends": []},
+            "lazy_private_channels": [],
+            "disclose": [],
+        }
+        return ready, supplemental
+
+    async def _send(self, ws: web.WebSocketResponse, op: int, data=None, event: str = None):
+        payload = {"op": op, "d": data}
+        if op == 0:
+            self.sequence += 1
+            payload["s"] = self.sequence
+            payload["t"] = event
+        await ws.send_str(json.dumps(payload))
+
+    async def dispatch(self, event: str, data: dict):
+        for ws in list(self.sockets):
+            if not ws.closed:
+                await self._send(ws, 0, data, event)
+
+    async def gateway(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(max_msg_size=0, compress=False)
+        await ws.prepare(request)
+        self.sockets.add(ws)
+        try:
+            await self._send(ws, 10, {"heartbeat_interval": 41250})
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                payload = json.loads(msg.data)
+                op = payload.get("op")
+                if op == 1:
+                    await self._send(ws, 11)
+                elif op == 2:
+                    ready, supplemental = self._ready()
+                    await self._send(ws, 0, ready, "READY")
+                    await self._send(ws, 0, supplemental, "READY_SUPPLEMENTAL")
+                elif op == 6:
+                    await self._send(ws, 0, {}, "RESUMED")
+                elif op == 14 and payload["d"].get("channels"):
+                    # Member sidebar subscription, sent while the client
+                    # chunks small guilds before READY
+                    request = payload["d"]
+                    update = self._member_list_update(int(request["guild_id"]), request["channels"])
+                    await self._send(ws, 0, update, "GUILD_MEMBER_LIST_UPDATE")
+                elif op == 8:
+                    request = payload["d"]
+                    guild_ids = request["guild_id"]
+                    for guild_id in guild_ids if isinstance(guild_ids, list) else [guild_ids]:
+                        members = self._query_members(int(guild_id), request.get("query") or "", request.get("limit") or 100)
+                        chunk = {
+                            "guild_id": str(guild_id),
+                            "members": members,
+                            "chunk_index": 0,
+                            "chunk_count": 1,
+                        }
+                        if "nonce" in request:
+                            chunk["nonce"] = request["nonce"]
+                        await self._send(ws, 0, chunk, "GUILD_MEMBERS_CHUNK")
+        finally:
+            self.sockets.discard(ws)
+        return ws
+
+    # REST
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler):
+        if request.path == "/":
+            return await handler(request)
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.requests[f"{request.method} {route}"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        response = await handler(request)
+        response.headers.update(
+            {
+                "X-RateLimit-Limit": "50",
+                "X-RateLimit-Remaining": "49",
+                "X-RateLimit-Reset-After": "1",
+                "X-RateLimit-Bucket": f"bench-{request.method}-{route}",
+            }
+        )
+        return response
+
+    async def not_found(self, request: web.Request) -> web.Response:
+        self.unknown_routes[f"{request.method} {request.path}"] += 1
+        return _json({"message": "404: Not Found", "code": 0}, status=404)
+
+    async def get_me(self, request: web.Request) -> web.Response:
+        return _json(self.user)
+
+    def _history(self, request: web.Request) -> list[dict] | None:
+        return self.messages.get(int(request.match_info["channel_id"]))
+
+    async def get_messages(self, request: web.Request) -> web.Response:
+        history = self._history(request)
+        if history is None:
+            return await self.not_found(request)
+        query = request.query
+        limit = min(int(query.get("limit", 50)), 100)
+        ids = [int(m["id"]) for m in history]
+
+        if "around" in query:
+            around = int(query["around"])
+            index = next((i for i, message_id in enumerate(ids) if message_id >= around), len(ids))
+            start = max(0, index - limit // 2)
+            page = history[start : start + limit]
+        elif "after" in query:
+            after = int(query["after"])
+            before = int(query["before"]) if "before" in query else None
+            page = [m for m in history if int(m["id"]) > after and (before is None or int(m["id"]) < before)][:limit]
+        else:
+            before = int(query["before"]) if "before" in query else None
+            page = [m for m in history if before is None or int(m["id"]) < before][-limit:]
+        # Discord returns pages newest first
+        return _json(list(reversed(page)))
+
+    async def post_message(self, request: web.Request) -> web.Response:
+        history = self._history(request)
+        if history is None:
+            return await self.not_found(request)
+        body = await request.json()
+        channel_id = int(request.match_info["channel_id"])
+        self.next_ms += 1000
+        message = self._message(
+            snowflake(self.next_ms),
+            channel_id,
+            self.channel_guild[channel_id],
+            self.user,
+            body.get("content", ""),
+        )
+        if "nonce" in body:
+            message["nonce"] = body["nonce"]
+        history.append(message)
+        await self.dispatch("MESSAGE_CREATE", message)
+        return _json(message)
+
+    async def no_content(self, request: web.Request) -> web.Response:
+        return web.Response(status=204)
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.middleware])
+        app.router.add_get("/", self.gateway)
+        api = "/api/v{version}"
+        app.router.add_get(api + "/users/@me", self.get_me)
+        app.router.add_get(api + "/channels/{channel_id}/messages", self.get_messages)
+        app.router.add_post(api + "/channels/{channel_id}/messages", self.post_message)
+        app.router.add_put(
+            api + "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me", self.no_content
+        )
+        app.router.add_route("*", "/{tail:.*}", self.not_found)
+        return app
+
+    async def start(self, port: int = 0) -> str:
+        self.runner = web.AppRunner(self.app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self):
+        for ws in list(self.sockets):
+            await ws.close()
+        if self.runner is not None:
+            await self.runner.cleanup()
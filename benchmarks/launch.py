@@ -0,0 +1,47 @@
+"""Runs the MCP server over stdio against the fake Discord server at
+FAKE_DISCORD_URL instead of discord.com.
+
+Started by run.py as the MCP server subprocess; not meant to be run directly.
+"""
+
+import os
+import asyncio
+import yarl
+import discord.http
+import discord.utils
+from discord.gateway import DiscordWebSocket
+
+PROPERTIES = {
+    "os": "Windows",
+    "browser": "Chrome",
+    "device": "",
+    "browser_user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "browser_version": "120.0.0.0",
+    "os_version": "10",
+    "system_locale": "en-US",
+    "release_channel": "stable",
+    "client_build_number": 9999,
+    "client_event_source": None,
+}
+
+
+async def _get_info(session):
+    # Normally fetched from third-party services at startup
+    return PROPERTIES, "e30="
+
+
+def patch_discord(url: str):
+    discord.http.Route.BASE = f"{url}/api/v{discord.http.INTERNAL_API_VERSION}"
+    DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(url.replace("http", "ws", 1) + "/")
+    discord.utils._get_info = _get_info
+
+
+def main():
+    patch_discord(os.environ["FAKE_DISCORD_URL"])
+    from discord_py_self_mcp import main as server
+
+    asyncio.run(server.run_app())
+
+
+if __name__ == "__main__":
+    main()
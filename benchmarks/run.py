@@ -0,0 +1,210 @@
+"""Offline end-to-end benchmarks.
+
+Starts the fake Discord server, launches the MCP server over stdio against
+it and measures startup-to-ready time, per-tool latency and throughput
+under concurrent load. No network access or Discord account is needed.
+
+    python benchmarks/run.py                          # print results
+    python benchmarks/run.py --save baseline.json     # record a baseline
+    python benchmarks/run.py --baseline baseline.json # exit 1 on regressions
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from fake_discord import FakeDiscord
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Metrics where a larger value is a regression; everything else is a rate
+LOWER_IS_BETTER = ("_ms",)
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _summary(samples: list[float]) -> dict:
+    return {
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(_percentile(samples, 0.95), 2),
+        "mean_ms": round(statistics.fmean(samples), 2),
+    }
+
+
+async def _timed_call(session: ClientSession, name: str, arguments: dict) -> float:
+    started = time.perf_counter()
+    result = await session.call_tool(name, arguments)
+    elapsed = (time.perf_counter() - started) * 1000
+    if result.isError:
+        raise RuntimeError(f"{name} failed: {result.content[0].text if result.content else result}")
+    return elapsed
+
+
+def _scenarios(fake: FakeDiscord) -> dict[str, tuple[str, dict]]:
+    guild = fake.guilds[0]
+    channels = [channel["id"] for channel in guild["channels"]]
+    message = fake.messages[int(channels[0])][-1]["id"]
+    return {
+        "list_guilds": ("list_guilds", {}),
+        "list_channels": ("list_channels", {"guild_id": guild["id"]}),
+        "read_messages_50": ("read_messages", {"channel_id": channels[0], "limit": 50}),
+        "read_messages_json_100": ("read_messages", {"channel_id": channels[0], "limit": 100, "format": "json"}),
+        "read_messages_500": ("read_messages", {"channel_id": channels[-1], "limit": 500}),
+        "search_messages": ("search_messages", {"channel_id": channels[1], "query": "needle", "limit": 5}),
+        "search_members": ("search_members", {"guild_id": guild["id"], "query": "deltaecho", "limit": 25}),
+        "send_message": ("send_message", {"channel_id": channels[2], "content": "benchmark"}),
+        "add_reaction": ("add_reaction", {"channel_id": channels[0], "message_id": message, "emoji": "👍"}),
+        "cache_stats": ("cache_stats", {}),
+    }
+
+
+async def _throughput(session: ClientSession, fake: FakeDiscord, concurrency: int, duration: float) -> dict:
+    channels = [channel["id"] for guild in fake.guilds for channel in guild["channels"]]
+    samples: list[float] = []
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int):
+        call = index
+        while time.perf_counter() < deadline:
+            channel_id = channels[call % len(channels)]
+            samples.append(await _timed_call(session, "read_messages", {"channel_id": channel_id, "limit": 50}))
+            call += concurrency
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {"calls_per_s": round(len(samples) / elapsed, 1), **_summary(samples)}
+
+
+async def run(args) -> dict:
+    fake = FakeDiscord(
+        guilds=args.guilds,
+        channels=args.channels,
+        messages=args.messages,
+        members=args.members,
+        latency_ms=args.rest_latency_ms,
+    )
+    url = await fake.start()
+    data_dir = tempfile.mkdtemp(prefix="discord-mcp-bench-")
+    env = dict(
+        os.environ,
+        FAKE_DISCORD_URL=url,
+        DISCORD_TOKEN="benchmark.token.not-a-real-token",
+        DISCORD_MCP_DATA_DIR=data_dir,
+        PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])),
+    )
+    for name in ("DISCORD_MCP_DAEMON", "GATEWAY_RESUME", "METRICS_PORT"):
+        env.pop(name, None)
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=[str(Path(__file__).with_name("launch.py"))],
+        env=env,
+        cwd=data_dir,
+    )
+
+    results: dict = {"config": vars(args).copy()}
+    results["config"].pop("baseline", None)
+    results["config"].pop("save", None)
+    with open(Path(data_dir) / "server.log", "w") as errlog:
+        started = time.perf_counter()
+        async with stdio_client(params, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                initialized = time.perf_counter()
+                await session.list_tools()
+                listed = time.perf_counter()
+                # list_guilds waits for the gateway cache, so it returns at READY
+                await _timed_call(session, "list_guilds", {})
+                ready = time.perf_counter()
+                results["startup"] = {
+                    "initialize_ms": round((initialized - started) * 1000, 1),
+                    "list_tools_ms": round((listed - started) * 1000, 1),
+                    "ready_ms": round((ready - started) * 1000, 1),
+                }
+
+                results["tools"] = {}
+                for label, (name, arguments) in _scenarios(fake).items():
+                    samples = [await _timed_call(session, name, arguments) for _ in range(args.iterations)]
+                    results["tools"][label] = _summary(samples)
+
+                results["throughput"] = await _throughput(session, fake, args.concurrency, args.duration)
+
+    await fake.stop()
+    results["rest_requests"] = dict(fake.requests.most_common())
+    if fake.unknown_routes:
+        results["unknown_routes"] = dict(fake.unknown_routes)
+    return results
+
+
+def _flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        if key in ("config", "rest_requests", "unknown_routes"):
+            continue
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_ms: float) -> list[str]:
+    """Return a line per metric that regressed by more than threshold."""
+    current = _flatten(results)
+    regressions = []
+    for metric, before in _flatten(baseline).items():
+        after = current.get(metric)
+        if after is None or not before:
+            continue
+        if metric.endswith(LOWER_IS_BETTER):
+            regressed = after > before * (1 + threshold) and after - before > min_ms
+        else:
+            regressed = after < before * (1 - threshold)
+        if regressed:
+            regressions.append(f"{metric}: {before} -> {after} ({(after - before) / before:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=3)
+    parser.add_argument("--channels", type=int, default=5, help="text channels per guild")
+    parser.add_argument("--messages", type=int, default=2000, help="messages per channel")
+    parser.add_argument("--members", type=int, default=5000, help="members per guild, served by member queries")
+    parser.add_argument("--rest-latency-ms", type=float, default=10.0, help="delay added to every REST response")
+    parser.add_argument("--iterations", type=int, default=20, help="calls per tool scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent callers in the throughput run")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds of throughput load")
+    parser.add_argument("--baseline", type=Path, help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="ignore latency changes smaller than this")
+    parser.add_argument("--save", type=Path, help="write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+    if results.get("unknown_routes"):
+        print(f"warning: fake server got unimplemented requests: {results['unknown_routes']}", file=sys.stderr)
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold, args.min_ms)
+        if regressions:
+            print("regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            sys.exit(1)
+        print("no regressions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
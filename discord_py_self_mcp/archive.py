@@ -0,0 +1,208 @@
+import os
+import asyncio
+import logging
+import sqlite3
+from typing import Iterable, Optional
+import discord
+from .paths import data_dir
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    channel_id INTEGER NOT NULL,
+    guild_id INTEGER,
+    author_id INTEGER,
+    author_name TEXT,
+    content TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS messages_channel ON messages (channel_id, id);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE OF content ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+END;
+"""
+
+UPSERT = """
+INSERT INTO messages (id, channel_id, guild_id, author_id, author_name, content)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    author_name = excluded.author_name,
+    content = excluded.content
+"""
+
+# The trigram tokenizer gives case-insensitive substring matching, which keeps
+# the "simple containment" semantics of search_messages. It needs at least 3
+# characters, so shorter queries use LIKE over the channel's rows instead.
+TRIGRAM_MIN_QUERY = 3
+
+
+class MessageArchive:
+    """Local SQLite store of seen messages with an FTS5 index on content.
+
+    Fed from gateway events and history backfill so searches never need REST.
+    Gateway messages are queued and written in one transaction per batch,
+    and once the archive holds more than max_messages the oldest are pruned.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_messages: int = 1_000_000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+    ):
+        self.path = path
+        self.max_messages = max_messages
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending: list[tuple] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        # Channels whose whole history is archived: backfilled from the newest
+        # message back to the start during this gateway session, and kept
+        # current by gateway events since
+        self.complete: set[int] = set()
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.trigram = self._create_fts()
+        self.conn.executescript(SCHEMA)
+        # Upper bound on the row count (updates are counted as inserts),
+        # recounted after each prune
+        self.rows = self.conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    @classmethod
+    def from_env(cls) -> Optional["MessageArchive"]:
+        if os.getenv("MESSAGE_ARCHIVE", "false").lower() not in ("1", "true", "on"):
+            return None
+        path = os.getenv("MESSAGE_ARCHIVE_PATH") or str(data_dir() / "messages.db")
+        try:
+            return cls(path, max_messages=int(os.getenv("MESSAGE_ARCHIVE_MAX_MESSAGES", "1000000")))
+        except sqlite3.Error as e:
+            logger.warning(f"Message archive disabled ({path}): {e}")
+            return None
+
+    def _create_fts(self) -> bool:
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5"
+                "(content, content='messages', content_rowid='id', tokenize='trigram')"
+            )
+            return True
+        except sqlite3.OperationalError:
+            # SQLite older than 3.34 has no trigram tokenizer
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5"
+                "(content, content='messages', content_rowid='id')"
+            )
+            return False
+
+    @staticmethod
+    def _row(message: discord.Message) -> tuple:
+        return (
+            message.id,
+            message.channel.id,
+            message.guild.id if message.guild else None,
+            message.author.id,
+            message.author.name,
+            message.content or "",
+        )
+
+    def store(self, message: discord.Message):
+        """Queue a gateway message for the next batch write."""
+        self.pending.append(self._row(message))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(self.flush_interval, self.flush)
+
+    def flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if self.pending:
+            rows, self.pending = self.pending, []
+            self._write(rows)
+
+    def store_many(self, messages: Iterable[discord.Message]):
+        self._write([self._row(m) for m in messages])
+
+    def _write(self, rows: list[tuple]):
+        with self.conn:
+            self.conn.executemany(UPSERT, rows)
+        self.rows += len(rows)
+        # Some slack, so a full archive is not pruned on every write
+        if self.max_messages and self.rows > self.max_messages * 1.1:
+            self.prune()
+
+    def prune(self):
+        """Drop the oldest messages beyond max_messages."""
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM messages WHERE id <= "
+                "(SELECT id FROM messages ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_messages,),
+            )
+        self.rows = self.conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        # Pruned channels no longer hold their whole history
+        self.complete.clear()
+
+    def update_content(self, message_id: int, content: str):
+        self.flush()
+        with self.conn:
+            self.conn.execute(
+                "UPDATE messages SET content = ? WHERE id = ?", (content, message_id)
+            )
+
+    def delete(self, message_ids: Iterable[int]):
+        self.flush()
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM messages WHERE id = ?", ((i,) for i in message_ids)
+            )
+
+    def oldest_id(self, channel_id: int) -> Optional[int]:
+        self.flush()
+        row = self.conn.execute(
+            "SELECT MIN(id) FROM messages WHERE channel_id = ?", (channel_id,)
+        ).fetchone()
+        return row[0]
+
+    def mark_complete(self, channel_id: int):
+        self.complete.add(channel_id)
+
+    def is_complete(self, channel_id: int) -> bool:
+        return channel_id in self.complete
+
+    def search(self, channel_id: int, query: str, limit: int) -> list[tuple]:
+        """Return (id, author_name, content) rows matching query, newest first."""
+        self.flush()
+        if self.trigram and len(query) >= TRIGRAM_MIN_QUERY:
+            phrase = '"' + query.replace('"', '""') + '"'
+            cursor = self.conn.execute(
+                "SELECT m.id, m.author_name, m.content FROM messages_fts f"
+                " JOIN messages m ON m.id = f.rowid"
+                " WHERE messages_fts MATCH ? AND m.channel_id = ?"
+                " ORDER BY m.id DESC LIMIT ?",
+                (phrase, channel_id, limit),
+            )
+        else:
+            pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            cursor = self.conn.execute(
+                "SELECT id, author_name, content FROM messages"
+                " WHERE channel_id = ? AND content LIKE ? ESCAPE '\\'"
+                " ORDER BY id DESC LIMIT ?",
+                (channel_id, pattern, limit),
+            )
+        return cursor.fetchall()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
@@ -1,13 +1,32 @@
 import os
-import os
+import sys
 import discord
 import asyncio
+import aiohttp
+import yarl
 import inspect
 import importlib
 from typing import Dict, Any, Optional
 from google.protobuf import json_format
 from dotenv import load_dotenv
-from .captcha.solver import HCaptchaSolver
+from discord.gateway import DiscordWebSocket, ReconnectWebSocket
+from .archive import MessageArchive
+from .cache_filter import CacheFilter
+from .catalog import CommandCatalog
+from .history import HistoryPrefetcher
+from .member_index import MemberIndex
+from .permissions import PermissionCache
+from .metrics import Metrics
+from .priority import RequestScheduler
+from .profiler import SamplingProfiler
+from .ratelimits import RateLimitMonitor
+from .recent import RecentMessages
+from .resolver import ChannelResolver, MessageResolver
+from .resume import ResumeStore
+from .subscriptions import SubscriptionManager
+from .tracing import Tracer
+from .users import UserIndex
+from . import startup
 
 load_dotenv()
 
@@ -30,8 +49,12 @@ if (
 async def captcha_handler(
     captcha_required, client: Optional[discord.Client] = None
 ) -> str:
-    print(f"[CAPTCHA] Triggered")
+    print(f"[CAPTCHA] Triggered", file=sys.stderr)
     try:
+        # The solver pulls in tls_client, numpy, camoufox/playwright and httpx,
+        # so it is only imported once a captcha actually shows up
+        from .captcha.solver import HCaptchaSolver
+
         sitekey = "a9b5fb07-92ff-493f-86fe-352a2803b3df"
         solver = HCaptchaSolver(
             sitekey=sitekey,
@@ -41,13 +64,13 @@ async def captcha_handler(
         )
         result = await solver.solve()
         if result.get("success"):
-            print(f"[CAPTCHA] Solved: {result['token'][:20]}...")
+            print(f"[CAPTCHA] Solved: {result['token'][:20]}...", file=sys.stderr)
             return result["token"]
         else:
-            print(f"[CAPTCHA] Failed: {result.get('error')}")
+            print(f"[CAPTCHA] Failed: {result.get('error')}", file=sys.stderr)
             raise Exception(f"Captcha solve failed: {result.get('error')}")
     except Exception as e:
-        print(f"[CAPTCHA] Error: {e}")
+        print(f"[CAPTCHA] Error: {e}", file=sys.stderr)
         raise
 
 
@@ -71,28 +94,259 @@ class CaptchaHandlerImpl(discord.CaptchaHandler):
 
 class SelfBot(discord.Client):
     def __init__(self):
+        # Set by close() before it ends a resumable session
+        self._shutting_down = False
         captcha_handler_instance = CaptchaHandlerImpl(self)
-        super().__init__(captcha_handler=captcha_handler_instance)
+        super().__init__(
+            captcha_handler=captcha_handler_instance,
+            max_messages=int(os.getenv("MAX_MESSAGES", "1000")),
+        )
+        self.tracer = Tracer.from_env()
+        self.profiler = SamplingProfiler.from_env()
+        self.archive = MessageArchive.from_env()
+        self.channel_resolver = ChannelResolver.from_env(self)
+        self.message_resolver = MessageResolver.from_env(self)
+        self.command_catalog = CommandCatalog.from_env()
+        self.history = HistoryPrefetcher.from_env()
+        self.recent = RecentMessages.from_env(self)
+        self.subscriptions = SubscriptionManager.from_env()
+        self.rest_scheduler = RequestScheduler.from_env()
+        self.rest_scheduler.install(self.http)
+        # Wrapped outside the scheduler so request timings include priority queueing
+        self.rate_limits = RateLimitMonitor.from_env()
+        self.rate_limits.install(self.http)
+        if self.tracer.enabled:
+            self.tracer.install(self.http)
+        self.metrics = Metrics.from_env(self)
+        self.cache_filter = CacheFilter.from_env()
+        if self.cache_filter:
+            self.cache_filter.install(self._connection)
+        self.user_index = UserIndex()
+        self.user_index.install(self._connection)
+        self.member_index = MemberIndex.from_env(self)
+        self.member_index.install()
+        self.permissions = PermissionCache.from_env(self)
+        # Installed after the filter so journaled events are filtered on replay
+        self.resume_store = ResumeStore.from_env()
+        self.ready_event = asyncio.Event()
+        if self.resume_store:
+            self.resume_store.install(self._connection)
+
+    async def connect(self, *, reconnect: bool = True) -> None:
+        saved = self.resume_store.load() if self.resume_store else None
+        if saved:
+            await self._connect_resumed(saved)
+        if not self.is_closed():
+            await super().connect(reconnect=reconnect)
+
+    async def _connect_resumed(self, saved: dict):
+        """Rebuild the cache from the journal and RESUME the saved session.
+
+        Returns when the session can no longer be resumed, leaving the
+        regular connect loop to IDENTIFY.
+        """
+        try:
+            self.resume_store.replay(self._connection)
+        except Exception as e:
+            print(f"[RESUME] Journal replay failed, identifying instead: {e}", file=sys.stderr)
+            self._connection.clear()
+            return
+
+        print(f"[RESUME] Resuming session {saved['session_id']}", file=sys.stderr)
+        self._connection.call_handlers("ready")
+        # on_ready only runs after a real READY
+        self._mark_ready()
+        ws_params = {
+            "initial": False,
+            "resume": True,
+            "session": saved["session_id"],
+            "sequence": saved["sequence"],
+            "gateway": yarl.URL(saved["gateway"]),
+        }
+        while not self.is_closed():
+            try:
+                coro = DiscordWebSocket.from_client(self, **ws_params)
+                self.ws = await asyncio.wait_for(coro, timeout=60.0)
+                while True:
+                    await self.ws.poll_event()
+            except ReconnectWebSocket as e:
+                self.dispatch("disconnect")
+                if not e.resume:
+                    # Session invalidated; READY will rebuild the cache
+                    return
+                ws_params.update(
+                    sequence=self.ws.sequence,
+                    session=self.ws.session_id,
+                    gateway=self.ws.gateway,
+                )
+            except (
+                OSError,
+                discord.HTTPException,
+                discord.GatewayNotFound,
+                discord.ConnectionClosed,
+                aiohttp.ClientError,
+                asyncio.TimeoutError,
+            ) as e:
+                self.dispatch("disconnect")
+                print(f"[RESUME] Resumed connection lost: {e}", file=sys.stderr)
+                return
+
+    async def setup_hook(self) -> None:
+        await self.metrics.start()
+
+    async def close(self) -> None:
+        await self.metrics.stop()
+        self.tracer.close()
+        if self.archive:
+            self.archive.flush()
+        if self.resume_store and not self.is_closed():
+            self.resume_store.save(self.ws)
+            # The connect loops would take the 4000 close for a dropped
+            # connection and RESUME, using up the session just saved
+            self._shutting_down = True
+            # Closing with 1000 would end the session on Discord's side
+            if self.ws is not None and self.ws.open:
+                await self.ws.close(code=4000)
+        await super().close()
+
+    def is_closed(self) -> bool:
+        # The connect loops stop once this is true
+        return self._shutting_down or super().is_closed()
+
+    def _mark_ready(self):
+        """Bookkeeping for a usable cache, after READY or a journal replay."""
+        startup.mark("ready")
+        self.ready_event.set()
+        self.subscriptions.self_id = self.user.id
 
     async def on_ready(self):
-        print(f"[READY] Logged in as {self.user} (ID: {self.user.id})")
-        print(f"[READY] Guilds: {len(self.guilds)}")
-        print(f"[READY] Private channels: {len(self.private_channels)}")
+        self._mark_ready()
+        # A new session may have missed messages since the buffers were filled
+        self.recent.clear()
+        if self.archive:
+            self.archive.complete.clear()
+        # READY replaces the guild objects and their member caches
+        self.member_index.clear()
+        self.permissions.clear()
+        if self.resume_store:
+            self.resume_store.discard()
+        print(f"[READY] Logged in as {self.user} (ID: {self.user.id})", file=sys.stderr)
+        print(f"[READY] Guilds: {len(self.guilds)}", file=sys.stderr)
+        print(f"[READY] Private channels: {len(self.private_channels)}", file=sys.stderr)
 
     async def on_connect(self):
-        print("[CONNECT] Connected to Discord gateway")
+        print("[CONNECT] Connected to Discord gateway", file=sys.stderr)
 
     async def on_disconnect(self):
-        print("[DISCONNECT] Disconnected from Discord gateway")
+        print("[DISCONNECT] Disconnected from Discord gateway", file=sys.stderr)
+        if self.resume_store:
+            self.resume_store.save(self.ws)
 
     async def on_error(self, event, *args, **kwargs):
         if isinstance(event, Exception):
-            print(f"[ERROR] {type(event).__name__}: {event}")
+            print(f"[ERROR] {type(event).__name__}: {event}", file=sys.stderr)
         else:
-            print(f"[ERROR] Event: {event}")
+            print(f"[ERROR] Event: {event}", file=sys.stderr)
 
     async def on_resumed(self):
-        print("[RESUMED] Session resumed")
+        print("[RESUMED] Session resumed", file=sys.stderr)
+        if self.resume_store:
+            self.resume_store.discard()
+
+    async def on_message(self, message: discord.Message):
+        if self.archive:
+            self.archive.store(message)
+        self.recent.add(message)
+        self.subscriptions.on_message(message)
+
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        self.message_resolver.invalidate(payload.message_id)
+        if self.archive and "content" in payload.data:
+            self.archive.update_content(payload.message_id, payload.data["content"])
+        self.recent.update(payload.channel_id, payload.message_id, payload.data)
+        self.subscriptions.on_edit(payload)
+
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        self.message_resolver.invalidate(payload.message_id)
+        if self.archive:
+            self.archive.delete([payload.message_id])
+        self.recent.remove(payload.channel_id, [payload.message_id])
+        self.subscriptions.on_delete(
+            payload.channel_id,
+            payload.guild_id,
+            [payload.message_id],
+            [payload.cached_message] if payload.cached_message else [],
+        )
+
+    async def on_raw_bulk_message_delete(
+        self, payload: discord.RawBulkMessageDeleteEvent
+    ):
+        for message_id in payload.message_ids:
+            self.message_resolver.invalidate(message_id)
+        if self.archive:
+            self.archive.delete(payload.message_ids)
+        self.recent.remove(payload.channel_id, payload.message_ids)
+        self.subscriptions.on_delete(
+            payload.channel_id, payload.guild_id, payload.message_ids, payload.cached_messages
+        )
+
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        # Renames happen in place on the cached user
+        self.user_index.add(after)
+        self.member_index.update_user(after)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        self.member_index.update(after)
+        if after.id == self.user.id:
+            self.permissions.invalidate_guild(after.guild.id)
+
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        # Ownership transfers change what this account may do
+        if before.owner_id != after.owner_id:
+            self.permissions.invalidate_guild(after.id)
+
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.member_index.forget(guild.id)
+        self.permissions.invalidate_guild(guild.id)
+
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        self.permissions.invalidate_guild(after.guild.id)
+
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.member_index.remove_role(role)
+        self.permissions.invalidate_guild(role.guild.id)
+
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        self.channel_resolver.invalidate(channel.id)
+
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        self.permissions.invalidate_channel(after)
+
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        self.channel_resolver.invalidate(channel.id)
+        self.recent.forget(channel.id)
+        self.permissions.invalidate_channel(channel)
+
+    async def on_private_channel_create(self, channel: discord.abc.PrivateChannel):
+        self.channel_resolver.invalidate(channel.id)
+
+    async def on_thread_create(self, thread: discord.Thread):
+        self.channel_resolver.invalidate(thread.id)
+
+    async def on_thread_delete(self, thread: discord.Thread):
+        self.channel_resolver.invalidate(thread.id)
+        self.recent.forget(thread.id)
+        self.permissions.invalidate_channel(thread)
+
+    async def on_guild_join(self, guild: discord.Guild):
+        # Channels that were Forbidden may be reachable now
+        self.channel_resolver.clear_failures()
+
+    async def on_application_command_counts_update(self, guild: discord.Guild, before, after):
+        self.command_catalog.invalidate(guild.id)
+
+    async def on_guild_integrations_update(self, guild: discord.Guild):
+        self.command_catalog.invalidate(guild.id)
 
 
 client = SelfBot()
@@ -0,0 +1,167 @@
+import os
+from typing import Optional
+
+# Dispatches that carry a guild channel id in "channel_id"; voice states are
+# left alone so moving into a filtered channel still updates the member
+CHANNEL_SCOPED_EXCLUDE = {"VOICE_STATE_UPDATE"}
+
+
+def _ids(value: Optional[str]) -> set[int]:
+    return {int(part) for part in (value or "").replace(" ", "").split(",") if part}
+
+
+class CacheFilter:
+    """Drops gateway data for guilds and channels outside the configured
+    allowlist/denylist before it reaches the cache.
+
+    Filtered guilds are never cached, so they are also never subscribed to
+    or chunked. Channel lists only apply to guild channels; a channel also
+    passes when its parent (category, or channel for threads) is allowed.
+    """
+
+    def __init__(
+        self,
+        guild_allow: set[int],
+        guild_deny: set[int],
+        channel_allow: set[int],
+        channel_deny: set[int],
+    ):
+        self.guild_allow = guild_allow
+        self.guild_deny = guild_deny
+        self.channel_allow = channel_allow
+        self.channel_deny = channel_deny
+        self.dropped: dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> Optional["CacheFilter"]:
+        cache_filter = cls(
+            _ids(os.getenv("GUILD_ALLOWLIST")),
+            _ids(os.getenv("GUILD_DENYLIST")),
+            _ids(os.getenv("CHANNEL_ALLOWLIST")),
+            _ids(os.getenv("CHANNEL_DENYLIST")),
+        )
+        if not any(
+            (
+                cache_filter.guild_allow,
+                cache_filter.guild_deny,
+                cache_filter.channel_allow,
+                cache_filter.channel_deny,
+            )
+        ):
+            return None
+        return cache_filter
+
+    def allows_guild(self, guild_id: Optional[int]) -> bool:
+        if guild_id is None:
+            return True
+        if guild_id in self.guild_deny:
+            return False
+        return not self.guild_allow or guild_id in self.guild_allow
+
+    def allows_channel(self, lineage: set[int]) -> bool:
+        """Check a channel given its id and the ids of its parents."""
+        if lineage & self.channel_deny:
+            return False
+        return not self.channel_allow or bool(lineage & self.channel_allow)
+
+    @staticmethod
+    def _lineage(channel_id: int, parent_id: Optional[int], parent_of) -> set[int]:
+        # thread -> channel -> category
+        lineage = {channel_id}
+        while parent_id and parent_id not in lineage:
+            lineage.add(parent_id)
+            parent_id = parent_of(parent_id)
+        return lineage
+
+    @staticmethod
+    def _cached_parent(guild, channel_id: int) -> Optional[int]:
+        channel = guild.get_channel_or_thread(channel_id) if guild else None
+        if channel is None:
+            return None
+        return getattr(channel, "parent_id", None) or getattr(channel, "category_id", None)
+
+    def _filter_guild_data(self, data: dict):
+        parents = {
+            int(c["id"]): int(c["parent_id"]) if c.get("parent_id") else None
+            for c in data.get("channels", []) + data.get("threads", [])
+        }
+        for key in ("channels", "threads"):
+            if key in data:
+                data[key] = [
+                    c
+                    for c in data[key]
+                    if self.allows_channel(
+                        self._lineage(int(c["id"]), parents[int(c["id"])], parents.get)
+                    )
+                ]
+
+    def install(self, state):
+        """Wrap the connection's dispatch parsers with the filter."""
+        for event, parser in list(state.parsers.items()):
+            state.parsers[event] = self._wrap(state, event, parser)
+
+    def _wrap(self, state, event: str, parser):
+        def parse(data):
+            if self._should_drop(state, event, data):
+                self.dropped[event] = self.dropped.get(event, 0) + 1
+                return
+            parser(data)
+        return parse
+
+    def _should_drop(self, state, event: str, data) -> bool:
+        if event == "READY_SUPPLEMENTAL":
+            self._filter_ready(state._ready_data, data)
+            return False
+        if not isinstance(data, dict):
+            return False
+
+        if event == "GUILD_CREATE":
+            if not self.allows_guild(int(data["id"])):
+                return True
+            self._filter_guild_data(data)
+            return False
+
+        guild_id = data.get("guild_id")
+        if guild_id is None:
+            return False
+        guild_id = int(guild_id)
+        if not self.allows_guild(guild_id):
+            return True
+
+        guild = state._get_guild(guild_id)
+
+        def parent_of(channel_id: int) -> Optional[int]:
+            return self._cached_parent(guild, channel_id)
+
+        if event.startswith(("CHANNEL_", "THREAD_")) and "id" in data and "type" in data:
+            parent_id = data.get("parent_id")
+            lineage = self._lineage(
+                int(data["id"]), int(parent_id) if parent_id else None, parent_of
+            )
+            return not self.allows_channel(lineage)
+        if data.get("channel_id") and event not in CHANNEL_SCOPED_EXCLUDE:
+            channel_id = int(data["channel_id"])
+            lineage = self._lineage(channel_id, parent_of(channel_id), parent_of)
+            return not self.allows_channel(lineage)
+        return False
+
+    def _filter_ready(self, ready: dict, extra: dict):
+        # READY_SUPPLEMENTAL is zipped index by index with READY's guilds
+        keep = []
+        for index, guild_data in enumerate(ready.get("guilds", [])):
+            guild_id = guild_data.get("id") or guild_data.get("properties", {}).get("id")
+            if self.allows_guild(int(guild_id)):
+                self._filter_guild_data(guild_data)
+                keep.append(index)
+        self.dropped["READY"] = len(ready.get("guilds", [])) - len(keep)
+
+        def pick(container: dict, key: str):
+            if key in container:
+                items = container[key]
+                container[key] = [items[i] for i in keep if i < len(items)]
+
+        pick(ready, "guilds")
+        pick(ready, "merged_members")
+        pick(extra, "guilds")
+        pick(extra, "merged_members")
+        pick(extra.get("merged_presences", {}), "guilds")
@@ -1,3 +1,4 @@
+import sys
 import os
 import json
 import base64
@@ -15,7 +16,7 @@ class AIAgent:
 
     def _debug_print(self, message: str):
         if self.debug:
-            print(f"[AGENT] {message}")
+            print(f"[AGENT] {message}", file=sys.stderr)
 
     def get_image_base64(self, image_url: str) -> Optional[str]:
         try:
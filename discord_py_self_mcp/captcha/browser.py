@@ -1,3 +1,4 @@
+import sys
 import asyncio
 import json
 import random
@@ -94,5 +95,5 @@ async def get_hsw_token(req: str, site: str, sitekey: str, proxy: Optional[Dict]
             return result
 
     except Exception as e:
-        print(f"HSW Error: {e}")
+        print(f"HSW Error: {e}", file=sys.stderr)
         return None
@@ -1,3 +1,4 @@
+import sys
 import json
 import time
 import asyncio
@@ -43,7 +44,7 @@ class HCaptchaSolver:
         self.HCAPTCHA_VERSION = self._get_version()
 
     def _log(self, msg: str):
-        if self.debug: print(f"[SOLVER] {msg}")
+        if self.debug: print(f"[SOLVER] {msg}", file=sys.stderr)
 
     def _get_version(self) -> str:
         try:
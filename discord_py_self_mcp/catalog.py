@@ -0,0 +1,112 @@
+import os
+import time
+import inspect
+from typing import Optional
+import discord
+
+
+async def _collect_commands(result) -> list:
+    if inspect.isawaitable(result):
+        result = await result
+    if result is None:
+        return []
+    if hasattr(result, "__aiter__"):
+        return [cmd async for cmd in result]
+    return list(result)
+
+
+class _Scope:
+    def __init__(self, ttl: float):
+        self.expires = time.monotonic() + ttl
+        # (application_id, name path) -> command or subcommand
+        self.index: dict[tuple[int, tuple[str, ...]], discord.SlashCommand] = {}
+        # root name -> application ids that have a command by that name
+        self.roots: dict[str, list[int]] = {}
+        self.queried: set[str] = set()
+
+    def add(self, command: discord.SlashCommand):
+        application_id = int(getattr(command, "application_id", 0) or 0)
+        apps = self.roots.setdefault(command.name, [])
+        if application_id not in apps:
+            apps.append(application_id)
+
+        stack = [((command.name,), command)]
+        while stack:
+            path, node = stack.pop()
+            self.index[(application_id, path)] = node
+            for child in getattr(node, "children", None) or []:
+                stack.append((path + (child.name,), child))
+
+
+class CommandCatalog:
+    """Slash commands per guild (or per DM channel), indexed by
+    (application_id, name path) and refreshed after a TTL or when the
+    gateway reports that a guild's commands changed.
+    """
+
+    def __init__(self, ttl: float = 600.0):
+        self.ttl = ttl
+        self.scopes: dict[int, _Scope] = {}
+        self.stats = {"hits": 0, "lookups": 0}
+
+    @classmethod
+    def from_env(cls) -> "CommandCatalog":
+        return cls(ttl=float(os.getenv("COMMAND_CACHE_TTL", "600")))
+
+    @staticmethod
+    def scope_id(channel) -> int:
+        guild = getattr(channel, "guild", None)
+        return guild.id if guild else channel.id
+
+    def _scope(self, scope_id: int) -> _Scope:
+        scope = self.scopes.get(scope_id)
+        if scope is None or scope.expires <= time.monotonic():
+            scope = self.scopes[scope_id] = _Scope(self.ttl)
+        return scope
+
+    async def _load(self, channel, root_name: str) -> list:
+        commands = []
+        slash_commands = getattr(channel, "slash_commands", None)
+        if callable(slash_commands):
+            try:
+                commands = await _collect_commands(slash_commands(query=root_name))
+            except Exception:
+                commands = []
+
+        application_commands = getattr(channel, "application_commands", None)
+        if not commands and callable(application_commands):
+            try:
+                commands = await _collect_commands(application_commands())
+            except Exception:
+                commands = []
+
+        return [cmd for cmd in commands if isinstance(cmd, discord.SlashCommand)]
+
+    async def roots(
+        self, channel, root_name: str, application_id: Optional[int] = None
+    ) -> list[discord.SlashCommand]:
+        """Return root commands named root_name available in the channel."""
+        scope = self._scope(self.scope_id(channel))
+        if root_name in scope.queried:
+            self.stats["hits"] += 1
+        else:
+            self.stats["lookups"] += 1
+            for command in await self._load(channel, root_name):
+                scope.add(command)
+            scope.queried.add(root_name)
+
+        apps = scope.roots.get(root_name, [])
+        if application_id is not None:
+            apps = [app for app in apps if app == application_id]
+        return [scope.index[(app, (root_name,))] for app in apps]
+
+    def get(
+        self, channel, application_id: int, path: tuple[str, ...]
+    ) -> Optional[discord.SlashCommand]:
+        scope = self.scopes.get(self.scope_id(channel))
+        if scope is None:
+            return None
+        return scope.index.get((application_id, path))
+
+    def invalidate(self, scope_id: int):
+        self.scopes.pop(scope_id, None)
@@ -0,0 +1,281 @@
+import asyncio
+import json
+import os
+import sys
+import time
+import logging
+import subprocess
+from typing import Callable, Optional
+from dotenv import load_dotenv
+from mcp.types import Tool, CallToolResult
+from .paths import data_dir
+
+logger = logging.getLogger(__name__)
+
+# Tool results can be large (message history), so raise the default 64 KiB line limit
+STREAM_LIMIT = 2**24
+
+class DaemonError(Exception):
+    pass
+
+
+def socket_path() -> str:
+    return os.getenv("DISCORD_MCP_SOCKET") or str(data_dir() / "daemon.sock")
+
+
+async def _write(writer: asyncio.StreamWriter, lock: asyncio.Lock, message: dict):
+    async with lock:
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+
+
+async def _handle_request(registry, current_session, subscriptions, request: dict) -> dict:
+    response = {"id": request.get("id")}
+    try:
+        method = request.get("method")
+        if method == "subscriptions":
+            response["result"] = await subscriptions.handle(
+                request["action"], request.get("session") or "default", request.get("uri")
+            )
+        elif method == "list_tools":
+            response["result"] = [
+                tool.model_dump(mode="json", exclude_none=True)
+                for tool in registry.get_tool_definitions()
+            ]
+        elif method == "call_tool":
+            from .tools.registry import ToolFailure
+
+            token = current_session.set(request.get("session") or "default")
+            try:
+                contents = await registry.call_tool(
+                    request["name"], request.get("arguments") or {}
+                )
+            finally:
+                current_session.reset(token)
+            response["result"] = CallToolResult(
+                content=list(contents), isError=isinstance(contents, ToolFailure)
+            ).model_dump(mode="json", exclude_none=True)
+        else:
+            raise ValueError(f"Unknown method {method}")
+    except Exception as e:
+        response["error"] = str(e)
+    return response
+
+
+async def serve(token: str):
+    """Run the Discord client and serve tool calls on the daemon socket."""
+    import fcntl
+
+    path = socket_path()
+    # Held for the daemon's lifetime. Probing and replacing the socket is
+    # not atomic, so without it two daemons spawned at once could both
+    # bind and log in with the same token
+    lock_file = open(path + ".lock", "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        logger.error(f"Daemon already running on {path}")
+        return
+    try:
+        await _serve(token, path)
+    finally:
+        lock_file.close()
+
+
+async def _serve(token: str, path: str):
+    from .bot import client
+    from .tools import registry
+    from .tools.registry import current_session
+    from .tools import messages
+
+    if os.path.exists(path):
+        try:
+            _, writer = await asyncio.open_unix_connection(path)
+            writer.close()
+            logger.error(f"Daemon already running on {path}")
+            return
+        except OSError:
+            os.unlink(path)
+
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        lock = asyncio.Lock()
+        tasks = set()
+        # MCP sessions served through this front end
+        sessions = set()
+
+        def spawn(coro):
+            task = asyncio.create_task(coro)
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        async def respond(request: dict):
+            response = await _handle_request(registry, current_session, client.subscriptions, request)
+            await _write(writer, lock, response)
+
+        def notify(subscription):
+            # Relayed to the front end, which owns the MCP session
+            if subscription.session in sessions:
+                spawn(_write(writer, lock, {"notify": subscription.uri, "session": subscription.session}))
+
+        client.subscriptions.listeners.append(notify)
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                if request.get("session"):
+                    sessions.add(request["session"])
+                spawn(respond(request))
+        except (ConnectionError, json.JSONDecodeError) as e:
+            logger.warning(f"Dropping front end connection: {e}")
+        finally:
+            client.subscriptions.listeners.remove(notify)
+            for session in sessions:
+                client.subscriptions.close_session(session)
+                messages.close_session(session)
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    server = await asyncio.start_unix_server(handle_connection, path=path, limit=STREAM_LIMIT)
+    os.chmod(path, 0o600)
+    logger.info(f"Daemon listening on {path}")
+
+    discord_task = asyncio.create_task(client.start(token))
+    try:
+        async with server:
+            serving = asyncio.create_task(server.serve_forever())
+            # A client that cannot log in (bad token, network) would leave
+            # every tool call waiting out READY_TIMEOUT, so stop serving
+            await asyncio.wait({serving, discord_task}, return_when=asyncio.FIRST_COMPLETED)
+            if discord_task.done():
+                error = None if discord_task.cancelled() else discord_task.exception()
+                logger.error(f"Discord client stopped, shutting down daemon: {error!r}")
+            serving.cancel()
+    finally:
+        await client.close()
+        discord_task.cancel()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+class DaemonClient:
+    """Front end side of the daemon socket: forwards tool calls and
+    multiplexes concurrent requests over one connection.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.lock = asyncio.Lock()
+        self.pending: dict[int, asyncio.Future] = {}
+        self.next_id = 0
+        self.tools: list[Tool] = []
+        # Called with (session, uri) when the daemon reports a subscription update
+        self.on_notify: Optional[Callable[[str, str], None]] = None
+        self.reconnect_lock = asyncio.Lock()
+        self.read_task = asyncio.create_task(self._read_responses())
+
+    @classmethod
+    async def connect(cls, spawn: bool = True, timeout: float = 30.0) -> "DaemonClient":
+        """Connect to the daemon socket, starting the daemon first if needed."""
+        daemon = cls(*await cls._open(spawn, timeout))
+        daemon.tools = [Tool.model_validate(t) for t in await daemon.request("list_tools")]
+        return daemon
+
+    @staticmethod
+    async def _open(spawn: bool, timeout: float) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        path = socket_path()
+        deadline = time.monotonic() + timeout
+        spawned = False
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(path, limit=STREAM_LIMIT)
+                break
+            except OSError:
+                if not spawn or time.monotonic() > deadline:
+                    raise DaemonError(f"Daemon not reachable on {path}")
+                if not spawned:
+                    _spawn_daemon()
+                    spawned = True
+                await asyncio.sleep(0.1)
+        return reader, writer
+
+    async def _reconnect(self):
+        """Reconnect after the daemon went away (crash or restart), starting
+        a new one if needed. Its subscriptions ended with the old daemon."""
+        async with self.reconnect_lock:
+            if not self.read_task.done():
+                return
+            self.writer.close()
+            logger.warning("Daemon connection lost, reconnecting")
+            self.reader, self.writer = await self._open(spawn=True, timeout=30.0)
+            self.read_task = asyncio.create_task(self._read_responses())
+
+    async def _read_responses(self):
+        try:
+            while line := await self.reader.readline():
+                response = json.loads(line)
+                if "notify" in response:
+                    if self.on_notify:
+                        self.on_notify(response["session"], response["notify"])
+                    continue
+                future = self.pending.pop(response.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if "error" in response:
+                    future.set_exception(DaemonError(response["error"]))
+                else:
+                    future.set_result(response.get("result"))
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(DaemonError("Daemon connection closed"))
+            self.pending.clear()
+
+    async def request(self, method: str, **params):
+        if self.read_task.done():
+            await self._reconnect()
+        self.next_id += 1
+        request_id = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        await _write(self.writer, self.lock, {"id": request_id, "method": method, **params})
+        return await future
+
+    async def call_tool(
+        self, name: str, arguments: dict, session: Optional[str] = None
+    ) -> CallToolResult:
+        result = await self.request(
+            "call_tool", name=name, arguments=arguments, session=session
+        )
+        return CallToolResult.model_validate(result)
+
+    def close(self):
+        self.read_task.cancel()
+        self.writer.close()
+
+
+def _spawn_daemon():
+    log = open(data_dir() / "daemon.log", "ab")
+    subprocess.Popen(
+        [sys.executable, "-m", "discord_py_self_mcp.daemon"],
+        stdin=subprocess.DEVNULL,
+        stdout=log,
+        stderr=log,
+        start_new_session=True,
+    )
+    log.close()
+
+
+def main():
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    token = os.getenv("DISCORD_TOKEN")
+    if not token:
+        logger.error("DISCORD_TOKEN environment variable not set")
+        return
+    asyncio.run(serve(token))
+
+
+if __name__ == "__main__":
+    main()
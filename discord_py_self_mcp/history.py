@@ -0,0 +1,134 @@
+import os
+import time
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Optional
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Largest page the history endpoint returns
+PAGE_SIZE = 100
+
+
+class HistoryReader:
+    """Pages of channel history, fetched by a background task that stays up
+    to read_ahead pages ahead of the consumer.
+
+    Pages come newest first, or oldest first when reading after a message.
+    Use as an async context manager so the fetch task stops when the
+    consumer does.
+    """
+
+    def __init__(
+        self,
+        prefetcher: "HistoryPrefetcher",
+        channel,
+        limit: int,
+        before: Optional[discord.abc.Snowflake] = None,
+        after: Optional[discord.abc.Snowflake] = None,
+    ):
+        self.prefetcher = prefetcher
+        self.channel = channel
+        self.limit = limit
+        self.before = before
+        self.after = after
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=prefetcher.read_ahead)
+        self.task: Optional[asyncio.Task] = None
+        self.done = False
+        # Network time of each page, in ms
+        self.page_latencies: list[float] = []
+
+    async def __aenter__(self) -> "HistoryReader":
+        self.task = asyncio.create_task(self._produce())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self.task
+
+    async def _produce(self):
+        stats = self.prefetcher.stats
+        remaining = self.limit
+        before, after = self.before, self.after
+        try:
+            while remaining > 0:
+                requested = min(PAGE_SIZE, remaining)
+                started = time.perf_counter()
+                page = [
+                    msg
+                    async for msg in self.channel.history(
+                        limit=requested, before=before, after=after
+                    )
+                ]
+                elapsed = (time.perf_counter() - started) * 1000
+                self.page_latencies.append(elapsed)
+                stats["pages"] += 1
+                stats["messages"] += len(page)
+                stats["fetch_ms"] += elapsed
+                logger.debug(
+                    f"History page of {len(page)} messages from {self.channel.id} in {elapsed:.0f} ms"
+                )
+
+                if page:
+                    await self.queue.put(page)
+                if len(page) < requested:
+                    break
+                remaining -= len(page)
+                if after is not None:
+                    after = page[-1]
+                else:
+                    before = page[-1]
+        except Exception as e:
+            await self.queue.put(e)
+            return
+        await self.queue.put(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> list[discord.Message]:
+        if self.done:
+            raise StopAsyncIteration
+        started = time.perf_counter()
+        item = await self.queue.get()
+        self.prefetcher.stats["wait_ms"] += (time.perf_counter() - started) * 1000
+        if item is None or isinstance(item, Exception):
+            self.done = True
+            if item is None:
+                raise StopAsyncIteration
+            raise item
+        return item
+
+    async def messages(self):
+        async for page in self:
+            for msg in page:
+                yield msg
+
+
+class HistoryPrefetcher:
+    """Creates HistoryReaders and keeps totals across them.
+
+    fetch_ms is time spent waiting on the network; wait_ms is how long
+    consumers sat idle waiting for a page. With read-ahead the second stays
+    well below the first.
+    """
+
+    def __init__(self, read_ahead: int = 2):
+        self.read_ahead = max(1, read_ahead)
+        self.stats = {"pages": 0, "messages": 0, "fetch_ms": 0.0, "wait_ms": 0.0}
+
+    @classmethod
+    def from_env(cls) -> "HistoryPrefetcher":
+        return cls(read_ahead=int(os.getenv("HISTORY_READ_AHEAD", "2")))
+
+    def read(
+        self,
+        channel,
+        limit: int,
+        before: Optional[discord.abc.Snowflake] = None,
+        after: Optional[discord.abc.Snowflake] = None,
+    ) -> HistoryReader:
+        return HistoryReader(self, channel, limit, before=before, after=after)
@@ -1,26 +1,135 @@
 import asyncio
+import json
 import os
+import sys
 import logging
+import weakref
+from discord_py_self_mcp import startup
 from mcp.server import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 from mcp.server.stdio import stdio_server
-from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
-from discord_py_self_mcp.bot import client
-from discord_py_self_mcp.tools import registry
+from mcp.types import Tool, Resource, CallToolResult
+from dotenv import load_dotenv
+from discord_py_self_mcp.daemon import DaemonClient
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("discord-selfbot-mcp")
 
 app = Server("discord-selfbot-mcp")
 
+# Set when DISCORD_MCP_DAEMON is enabled; tools then run in the shared daemon
+# instead of a Discord client owned by this process
+daemon: DaemonClient | None = None
+
+# MCP sessions by the key their tool calls run under, for pushing
+# subscription updates
+sessions: "weakref.WeakValueDictionary[str, object]" = weakref.WeakValueDictionary()
+_notify_tasks: set[asyncio.Task] = set()
+
+def _session_key() -> str:
+    session = app.request_context.session
+    key = f"{os.getpid()}:{id(session)}"
+    sessions[key] = session
+    return key
+
+def notify_updated(session_key: str, uri: str):
+    session = sessions.get(session_key)
+    if session is None:
+        return
+    task = asyncio.create_task(session.send_resource_updated(uri))
+    _notify_tasks.add(task)
+    task.add_done_callback(_notify_tasks.discard)
+
+async def _subscriptions(action: str, uri: str | None = None):
+    session = _session_key()
+    if daemon:
+        return await daemon.request("subscriptions", action=action, session=session, uri=uri)
+    from discord_py_self_mcp.bot import client
+    return await client.subscriptions.handle(action, session, uri)
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
-    return registry.get_tool_definitions()
+    if daemon:
+        tools = daemon.tools
+    else:
+        from discord_py_self_mcp.tools import registry
+        tools = registry.get_tool_definitions()
+    startup.check_budget()
+    return tools
 
 @app.call_tool()
-async def call_tool(name: str, arguments: dict) -> list[TextContent | ImageContent | EmbeddedResource]:
-    return await registry.call_tool(name, arguments)
+async def call_tool(name: str, arguments: dict) -> CallToolResult:
+    session = _session_key()
+    if daemon:
+        return await daemon.call_tool(name, arguments, session)
+
+    from discord_py_self_mcp.tools import registry
+    from discord_py_self_mcp.tools.registry import current_session, ToolFailure
+    token = current_session.set(session)
+    try:
+        contents = await registry.call_tool(name, arguments)
+    finally:
+        current_session.reset(token)
+    return CallToolResult(content=list(contents), isError=isinstance(contents, ToolFailure))
+
+@app.list_resources()
+async def list_resources() -> list[Resource]:
+    return [
+        Resource(
+            uri=subscription["uri"],
+            name=f"subscription {subscription['id']}",
+            description=f"{subscription['buffered']} unread events; reading the resource consumes them",
+            mimeType="application/json",
+        )
+        for subscription in await _subscriptions("list")
+    ]
+
+@app.read_resource()
+async def read_resource(uri) -> list[ReadResourceContents]:
+    result = await _subscriptions("read", str(uri))
+    return [ReadResourceContents(content=json.dumps(result), mime_type="application/json")]
+
+@app.subscribe_resource()
+async def subscribe_resource(uri):
+    await _subscriptions("notify_on", str(uri))
+
+@app.unsubscribe_resource()
+async def unsubscribe_resource(uri):
+    await _subscriptions("notify_off", str(uri))
+
+async def serve_stdio():
+    options = app.create_initialization_options()
+    # The low-level server always reports subscribe=False
+    options.capabilities.resources.subscribe = True
+    async with stdio_server() as (read_stream, write_stream):
+        await app.run(
+            read_stream,
+            write_stream,
+            options
+        )
 
 async def run_app():
+    global daemon
+
+    load_dotenv()
+    if os.getenv("DISCORD_MCP_DAEMON", "").lower() in ("1", "true", "on"):
+        # Attach to the long-lived daemon (starting it if needed) so this
+        # session reuses its warm gateway connection and caches
+        daemon = await DaemonClient.connect()
+        daemon.on_notify = notify_updated
+        try:
+            await serve_stdio()
+        finally:
+            daemon.close()
+        return
+
+    from discord_py_self_mcp.bot import client
+    # Imported for its side effects: registers the tools and wires the
+    # scheduler, metrics and tracer into the client before it starts
+    from discord_py_self_mcp.tools import registry  # noqa: F401
+
+    client.subscriptions.listeners.append(lambda s: notify_updated(s.session, s.uri))
+
     token = os.getenv("DISCORD_TOKEN")
     if not token:
         logger.error("DISCORD_TOKEN environment variable not set")
@@ -33,14 +142,16 @@ async def run_app():
     # We don't await it so it doesn't block the MCP server
     discord_task = asyncio.create_task(client.start(token))
 
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+    try:
+        await serve_stdio()
+    finally:
+        # Lets the client persist its gateway session for a quick RESUME
+        await client.close()
 
 def main():
+    if "--import-report" in sys.argv[1:]:
+        print(startup.import_report())
+        return
     asyncio.run(run_app())
 
 if __name__ == "__main__":
@@ -0,0 +1,240 @@
+import os
+import time
+from bisect import bisect_left, bisect_right, insort
+import discord
+
+
+def _names(member: discord.Member) -> tuple[str, ...]:
+    names = {member.name.casefold()}
+    # Only newer discord.py-self versions know global (display) names
+    global_name = getattr(member, "global_name", None)
+    if global_name:
+        names.add(global_name.casefold())
+    if member.nick:
+        names.add(member.nick.casefold())
+    return tuple(names)
+
+
+def _remove_sorted(values: list, value):
+    index = bisect_left(values, value)
+    if index < len(values) and values[index] == value:
+        del values[index]
+
+
+class GuildMemberIndex:
+    """Cached members of one guild, as sorted arrays: member ids for paging,
+    (name, id) pairs over usernames, global names and nicknames for prefix
+    search, and member ids per role."""
+
+    __slots__ = ("member_ids", "entries", "names", "roles", "member_roles", "complete_prefixes")
+
+    def __init__(self, members):
+        self.member_ids: list[int] = []
+        self.entries: list[tuple[str, int]] = []
+        self.names: dict[int, tuple[str, ...]] = {}
+        # role id -> sorted member ids, and member id -> role ids
+        self.roles: dict[int, list[int]] = {}
+        self.member_roles: dict[int, tuple[int, ...]] = {}
+        # Query prefix -> time the gateway returned every match for it
+        self.complete_prefixes: dict[str, float] = {}
+        for member in members:
+            names = _names(member)
+            self.names[member.id] = names
+            self.entries.extend((name, member.id) for name in names)
+            roles = tuple(member._roles)
+            self.member_roles[member.id] = roles
+            for role_id in roles:
+                self.roles.setdefault(role_id, []).append(member.id)
+        self.member_ids = sorted(self.names)
+        self.entries.sort()
+        for member_ids in self.roles.values():
+            member_ids.sort()
+
+    def _set_names(self, member_id: int, names: tuple[str, ...]):
+        for name in self.names.pop(member_id, ()):
+            _remove_sorted(self.entries, (name, member_id))
+        if names:
+            self.names[member_id] = names
+            for name in names:
+                insort(self.entries, (name, member_id))
+
+    def _set_roles(self, member_id: int, roles: tuple[int, ...]):
+        previous = self.member_roles.pop(member_id, ())
+        for role_id in set(previous).difference(roles):
+            member_ids = self.roles.get(role_id)
+            if member_ids is not None:
+                _remove_sorted(member_ids, member_id)
+                if not member_ids:
+                    del self.roles[role_id]
+        for role_id in set(roles).difference(previous):
+            insort(self.roles.setdefault(role_id, []), member_id)
+        if roles:
+            self.member_roles[member_id] = roles
+
+    def add(self, member: discord.Member):
+        """Index a new member, or reindex one whose names or roles changed."""
+        if member.id not in self.names:
+            insort(self.member_ids, member.id)
+        names = _names(member)
+        if self.names.get(member.id) != names:
+            self._set_names(member.id, names)
+        roles = tuple(member._roles)
+        if self.member_roles.get(member.id, ()) != roles:
+            self._set_roles(member.id, roles)
+
+    def remove(self, member_id: int):
+        if member_id not in self.names:
+            return
+        self._set_names(member_id, ())
+        self._set_roles(member_id, ())
+        _remove_sorted(self.member_ids, member_id)
+
+    def remove_role(self, role_id: int):
+        for member_id in self.roles.pop(role_id, ()):
+            roles = tuple(r for r in self.member_roles.get(member_id, ()) if r != role_id)
+            if roles:
+                self.member_roles[member_id] = roles
+            else:
+                self.member_roles.pop(member_id, None)
+
+    def page(self, limit: int, after: int = 0) -> list[int]:
+        start = bisect_right(self.member_ids, after)
+        return self.member_ids[start : start + limit]
+
+    def role_page(self, role_id: int, limit: int, after: int = 0) -> list[int]:
+        member_ids = self.roles.get(role_id, [])
+        start = bisect_right(member_ids, after)
+        return member_ids[start : start + limit]
+
+    def search(self, prefix: str, limit: int) -> list[int]:
+        """Ids of members with a name starting with prefix, in name order."""
+        prefix = prefix.casefold()
+        found: dict[int, None] = {}
+        index = bisect_left(self.entries, (prefix,))
+        while index < len(self.entries) and len(found) < limit:
+            name, member_id = self.entries[index]
+            if not name.startswith(prefix):
+                break
+            found[member_id] = None
+            index += 1
+        return list(found)
+
+    def is_complete(self, prefix: str, ttl: float) -> bool:
+        """Whether a gateway query already returned every member matching
+        prefix (or a shorter prefix of it) within ttl seconds."""
+        now = time.monotonic()
+        prefix = prefix.casefold()
+        return any(
+            prefix.startswith(queried) and now - at < ttl
+            for queried, at in self.complete_prefixes.items()
+        )
+
+
+class MemberIndex:
+    """Per-guild member indexes, built on first use from the guild's member
+    cache and then kept current as members are added (joins, chunks,
+    queries), updated (names, nicknames, roles) or removed.
+
+    Guilds are only indexed once a tool searches or lists them, so accounts
+    with many large guilds pay nothing for the ones never queried.
+    """
+
+    def __init__(self, client: discord.Client, query_ttl: float = 300.0, max_prefixes: int = 256):
+        self.client = client
+        self.query_ttl = query_ttl
+        self.max_prefixes = max_prefixes
+        self.guilds: dict[int, GuildMemberIndex] = {}
+        self.stats = {
+            "index_hits": 0,
+            "gateway_queries": 0,
+            "query_members_cached": 0,
+            "builds": 0,
+        }
+
+    @classmethod
+    def from_env(cls, client: discord.Client) -> "MemberIndex":
+        return cls(client, query_ttl=float(os.getenv("MEMBER_QUERY_TTL", "300")))
+
+    def install(self):
+        """Follow member cache changes made anywhere in the library."""
+        if getattr(discord.Guild, "_member_indexed", False):
+            return
+        add_member = discord.Guild._add_member
+        remove_member = discord.Guild._remove_member
+        index = self
+
+        def indexed_add_member(guild, member, /):
+            add_member(guild, member)
+            guild_index = index.guilds.get(guild.id)
+            if guild_index is not None:
+                guild_index.add(member)
+
+        def indexed_remove_member(guild, member, /):
+            remove_member(guild, member)
+            guild_index = index.guilds.get(guild.id)
+            if guild_index is not None:
+                guild_index.remove(member.id)
+
+        discord.Guild._add_member = indexed_add_member
+        discord.Guild._remove_member = indexed_remove_member
+        discord.Guild._member_indexed = True
+
+    def get(self, guild: discord.Guild) -> GuildMemberIndex:
+        guild_index = self.guilds.get(guild.id)
+        if guild_index is None:
+            guild_index = self.guilds[guild.id] = GuildMemberIndex(guild._members.values())
+            self.stats["builds"] += 1
+        return guild_index
+
+    def update(self, member: discord.Member):
+        guild_index = self.guilds.get(member.guild.id)
+        if guild_index is not None:
+            guild_index.add(member)
+
+    def update_user(self, user: discord.User):
+        """Reindex a renamed user in every indexed guild they are in."""
+        for guild_id, guild_index in self.guilds.items():
+            if user.id in guild_index.names:
+                guild = self.client.get_guild(guild_id)
+                member = guild.get_member(user.id) if guild else None
+                if member is not None:
+                    guild_index.add(member)
+
+    def remove_role(self, role: discord.Role):
+        guild_index = self.guilds.get(role.guild.id)
+        if guild_index is not None:
+            guild_index.remove_role(role.id)
+
+    def forget(self, guild_id: int):
+        self.guilds.pop(guild_id, None)
+
+    def clear(self):
+        self.guilds.clear()
+
+    async def search(self, guild: discord.Guild, query: str, limit: int) -> list[discord.Member]:
+        """Members whose username, global name or nickname starts with query.
+
+        The local index answers when it has enough matches, the whole guild
+        is cached, or a recent gateway query already returned every match;
+        otherwise the gateway member query fills the cache first.
+        """
+        guild_index = self.get(guild)
+        ids = guild_index.search(query, limit)
+        if (
+            len(ids) >= limit
+            or guild.chunked
+            or guild_index.is_complete(query, self.query_ttl)
+        ):
+            self.stats["index_hits"] += 1
+        else:
+            self.stats["gateway_queries"] += 1
+            # Cached members are added through Guild._add_member, and so
+            # to the index
+            members = await guild.query_members(query, limit=min(limit, 100), presences=False, cache=True)
+            self.stats["query_members_cached"] += len(members)
+            if len(members) < min(limit, 100):
+                if len(guild_index.complete_prefixes) >= self.max_prefixes:
+                    guild_index.complete_prefixes.clear()
+                guild_index.complete_prefixes[query.casefold()] = time.monotonic()
+            ids = guild_index.search(query, limit)
+        return [member for member in map(guild.get_member, ids) if member is not None]
@@ -0,0 +1,269 @@
+import os
+import math
+import asyncio
+import logging
+from bisect import bisect_left
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the tool latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value) -> str:
+    if isinstance(value, float) and (math.isinf(value) or math.isnan(value)):
+        return "NaN"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        index = bisect_left(LATENCY_BUCKETS, seconds)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+class _Writer:
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def family(self, name: str, kind: str, help_text: str, samples):
+        """Add a metric family; samples are (labels, value) pairs."""
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self.lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+
+class Metrics:
+    """Per-tool call counts and latency histograms, rendered together with
+    the client's cache, scheduler, REST and gateway counters in the
+    Prometheus text format.
+
+    Served on METRICS_PORT (bound to METRICS_HOST) and/or written to
+    METRICS_FILE every METRICS_INTERVAL seconds; both are off by default.
+    """
+
+    def __init__(
+        self,
+        client,
+        port: Optional[int] = None,
+        host: str = "127.0.0.1",
+        path: Optional[Path] = None,
+        interval: float = 15.0,
+    ):
+        self.client = client
+        self.port = port
+        self.host = host
+        self.path = path
+        self.interval = interval
+        self.calls: dict[tuple[str, str], int] = {}
+        self.latency: dict[str, _Histogram] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.dump_task: Optional[asyncio.Task] = None
+        # Set by the tools package to the registry's ToolScheduler
+        self.tool_scheduler = None
+
+    @classmethod
+    def from_env(cls, client) -> "Metrics":
+        port = os.getenv("METRICS_PORT")
+        path = os.getenv("METRICS_FILE")
+        return cls(
+            client,
+            port=int(port) if port else None,
+            host=os.getenv("METRICS_HOST", "127.0.0.1"),
+            path=Path(path) if path else None,
+            interval=float(os.getenv("METRICS_INTERVAL", "15")),
+        )
+
+    def observe_tool(self, name: str, seconds: float, ok: bool):
+        key = (name, "ok" if ok else "error")
+        self.calls[key] = self.calls.get(key, 0) + 1
+        histogram = self.latency.get(name)
+        if histogram is None:
+            histogram = self.latency[name] = _Histogram()
+        histogram.observe(seconds)
+
+    def render(self) -> str:
+        out = _Writer()
+        prefix = "discord_mcp"
+
+        out.family(
+            f"{prefix}_tool_calls_total",
+            "counter",
+            "Tool calls by outcome",
+            [({"tool": tool, "outcome": outcome}, count) for (tool, outcome), count in sorted(self.calls.items())],
+        )
+        out.lines.append(f"# HELP {prefix}_tool_duration_seconds Tool call latency, including queueing")
+        out.lines.append(f"# TYPE {prefix}_tool_duration_seconds histogram")
+        for tool, histogram in sorted(self.latency.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+                cumulative += count
+                out.lines.append(
+                    f"{prefix}_tool_duration_seconds_bucket{_labels({'tool': tool, 'le': bound})} {cumulative}"
+                )
+            out.lines.append(
+                f"{prefix}_tool_duration_seconds_bucket{_labels({'tool': tool, 'le': '+Inf'})} {histogram.count}"
+            )
+            out.lines.append(f"{prefix}_tool_duration_seconds_sum{_labels({'tool': tool})} {_number(histogram.sum)}")
+            out.lines.append(f"{prefix}_tool_duration_seconds_count{_labels({'tool': tool})} {histogram.count}")
+
+        client = self.client
+        if self.tool_scheduler is not None:
+            stats = self.tool_scheduler.stats
+            out.family(f"{prefix}_tools_in_flight", "gauge", "Tool calls running", [({}, stats["in_flight"])])
+            out.family(
+                f"{prefix}_tools_queued",
+                "gauge",
+                "Tool calls waiting for a resource key or an in-flight slot",
+                [({"stage": "key"}, stats["waiting_for_key"]), ({"stage": "slot"}, stats["waiting_for_slot"])],
+            )
+
+        monitor = client.rate_limits
+        out.family(
+            f"{prefix}_rest_requests_total",
+            "counter",
+            "REST requests by route",
+            [({"route": route}, stats.calls) for route, stats in sorted(monitor.routes.items())],
+        )
+        out.family(
+            f"{prefix}_rest_errors_total",
+            "counter",
+            "REST requests that raised, by route",
+            [({"route": route}, stats.errors) for route, stats in sorted(monitor.routes.items())],
+        )
+        out.family(
+            f"{prefix}_rest_throttled_seconds_total",
+            "counter",
+            "Time REST requests waited on rate limit buckets or 429 retries, by route",
+            [({"route": route}, stats.throttled_ms / 1000) for route, stats in sorted(monitor.routes.items())],
+        )
+        out.family(
+            f"{prefix}_rest_rate_limited_total",
+            "counter",
+            "429 responses",
+            [({}, monitor.stats["rate_limited"])],
+        )
+        scheduler = client.rest_scheduler
+        out.family(
+            f"{prefix}_rest_in_flight",
+            "gauge",
+            "REST requests in flight by priority",
+            [({"priority": priority}, count) for priority, count in scheduler.in_flight.items()],
+        )
+        out.family(
+            f"{prefix}_rest_queued",
+            "gauge",
+            "REST requests waiting for admission by priority",
+            [({"priority": priority}, len(waiters)) for priority, waiters in scheduler.waiters.items()],
+        )
+
+        cache_samples = []
+        for cache, stats in (
+            ("channels", client.channel_resolver.stats),
+            ("messages", client.message_resolver.stats),
+            ("commands", client.command_catalog.stats),
+            ("recent", client.recent.stats),
+            ("users", client.user_index.stats),
+            ("members", client.member_index.stats),
+            ("permissions", client.permissions.stats),
+        ):
+            cache_samples += [({"cache": cache, "result": key}, value) for key, value in stats.items()]
+        out.family(f"{prefix}_cache_lookups_total", "counter", "Cache lookups by result", cache_samples)
+
+        history = client.history.stats
+        out.family(f"{prefix}_history_pages_total", "counter", "History pages fetched", [({}, history["pages"])])
+        out.family(
+            f"{prefix}_history_fetch_seconds_total",
+            "counter",
+            "Time spent fetching history pages",
+            [({}, history["fetch_ms"] / 1000)],
+        )
+
+        out.family(
+            f"{prefix}_gateway_latency_seconds",
+            "gauge",
+            "Gateway heartbeat latency",
+            [({}, client.latency)],
+        )
+        out.family(f"{prefix}_ready", "gauge", "Whether the gateway cache is ready", [({}, int(client.ready_event.is_set()))])
+        out.family(f"{prefix}_guilds", "gauge", "Guilds in the cache", [({}, len(client.guilds))])
+        return "\n".join(out.lines) + "\n"
+
+    async def start(self):
+        if self.port is not None and self.server is None:
+            try:
+                self.server = await asyncio.start_server(self._serve, self.host, self.port)
+                logger.info(f"Metrics served on http://{self.host}:{self.port}/metrics")
+            except OSError as e:
+                logger.warning(f"Metrics endpoint not started on port {self.port}: {e}")
+        if self.path is not None and self.dump_task is None:
+            self.dump_task = asyncio.create_task(self._dump_loop())
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        if self.dump_task is not None:
+            self.dump_task.cancel()
+            self.dump_task = None
+        if self.path is not None:
+            self.dump()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode(errors="replace").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] in ("/", "/metrics"):
+                status, body = "200 OK", self.render().encode()
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def dump(self):
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(self.render())
+        os.replace(tmp_path, self.path)
+
+    async def _dump_loop(self):
+        while True:
+            try:
+                self.dump()
+            except Exception as e:
+                logger.warning(f"Could not write metrics to {self.path}: {e}")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,11 @@
+import os
+from pathlib import Path
+
+
+def data_dir() -> Path:
+    """Directory for local state (message archive, sockets, session files)."""
+    path = Path(
+        os.getenv("DISCORD_MCP_DATA_DIR") or Path.home() / ".discord-selfbot-mcp"
+    ).expanduser()
+    path.mkdir(parents=True, exist_ok=True)
+    return path
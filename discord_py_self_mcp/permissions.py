@@ -0,0 +1,109 @@
+import os
+import time
+from typing import Optional, Union
+import discord
+
+_FOREVER = float("inf")
+
+
+class PermissionCache:
+    """This account's effective permissions per guild channel (and per
+    guild, for guild-wide actions like kicks), computed locally from roles
+    and overwrites, so tools can refuse requests Discord would answer with
+    403 without spending a REST call or rate limit budget on them.
+
+    Entries are dropped when a role, a channel's overwrites or this
+    account's own member (roles, timeout) change, and all of them after
+    READY. Where permissions cannot be computed locally (private channels,
+    guilds without this account's member cached) nothing is checked.
+    """
+
+    def __init__(self, client: discord.Client, enabled: bool = True):
+        self.client = client
+        self.enabled = enabled
+        # guild id -> channel id (0 for the guild itself) ->
+        # (permissions, valid until, channel or thread parent id)
+        self.guilds: dict[int, dict[int, tuple[discord.Permissions, float, int]]] = {}
+        self.stats = {"hits": 0, "computed": 0, "denied": 0, "invalidations": 0}
+
+    @classmethod
+    def from_env(cls, client: discord.Client) -> "PermissionCache":
+        enabled = os.getenv("PERMISSION_CHECKS", "true").lower() not in ("0", "false", "off")
+        return cls(client, enabled=enabled)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.guilds.values())
+
+    def get(self, guild: discord.Guild, channel=None) -> Optional[discord.Permissions]:
+        """This account's permissions in channel, or in the guild when
+        channel is None; None when they cannot be computed."""
+        me = guild.me
+        if me is None:
+            return None
+        entries = self.guilds.setdefault(guild.id, {})
+        key = channel.id if channel is not None else 0
+        entry = entries.get(key)
+        if entry is not None and entry[1] > time.time():
+            self.stats["hits"] += 1
+            return entry[0]
+        try:
+            permissions = channel.permissions_for(me) if channel is not None else me.guild_permissions
+        except discord.ClientException:
+            # Thread whose parent channel is not cached
+            return None
+        # Timeouts end without a gateway event
+        until = me.timed_out_until.timestamp() if me.is_timed_out() else _FOREVER
+        parent_id = getattr(channel, "parent_id", None) or key
+        entries[key] = (permissions, until, parent_id)
+        self.stats["computed"] += 1
+        return permissions
+
+    def check(self, target: Union[discord.Guild, discord.abc.GuildChannel, discord.Thread], *names: str) -> Optional[str]:
+        """An error naming the permissions this account lacks in a channel
+        or guild, or None if it has them or they cannot be checked."""
+        if not self.enabled:
+            return None
+        if isinstance(target, discord.Guild):
+            guild, channel, where = target, None, target.name
+        else:
+            guild, channel = getattr(target, "guild", None), target
+            if guild is None:
+                return None
+            where = f"#{target.name}"
+        permissions = self.get(guild, channel)
+        if permissions is None:
+            return None
+        missing = [name for name in names if not getattr(permissions, name)]
+        if not missing:
+            return None
+        self.stats["denied"] += 1
+        return f"Missing permissions in {where}: {', '.join(missing)}"
+
+    def check_hierarchy(self, guild: discord.Guild, member: discord.Member) -> Optional[str]:
+        """An error if member's roles put them out of this account's reach
+        for kicks, bans and role changes, or None."""
+        me = guild.me
+        if not self.enabled or me is None or me.id == guild.owner_id:
+            return None
+        if member.id == guild.owner_id or member.top_role >= me.top_role:
+            self.stats["denied"] += 1
+            return f"Cannot act on {member.name}: not below this account in the role hierarchy"
+        return None
+
+    def invalidate_guild(self, guild_id: int):
+        if self.guilds.pop(guild_id, None) is not None:
+            self.stats["invalidations"] += 1
+
+    def invalidate_channel(self, channel: Union[discord.abc.GuildChannel, discord.Thread]):
+        """Drop a channel's entry and those of threads under it."""
+        entries = self.guilds.get(channel.guild.id)
+        if not entries:
+            return
+        stale = [key for key, entry in entries.items() if key == channel.id or entry[2] == channel.id]
+        for key in stale:
+            del entries[key]
+        if stale:
+            self.stats["invalidations"] += 1
+
+    def clear(self):
+        self.guilds.clear()
@@ -0,0 +1,108 @@
+import os
+import time
+import asyncio
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+
+# Highest first
+PRIORITIES = ("interactive", "normal", "background")
+
+
+class RequestScheduler:
+    """Admits REST requests by priority class before they reach the HTTP
+    client's rate limit buckets.
+
+    Up to max_concurrency requests run at once and queued requests start
+    highest priority first. Background requests additionally wait while any
+    interactive request is queued or running, and at most
+    background_concurrency of them run at once, so long backfills cannot
+    fill the buckets ahead of user-facing calls.
+    """
+
+    def __init__(self, max_concurrency: int = 10, background_concurrency: int = 2):
+        self.max_concurrency = max(1, max_concurrency)
+        self.background_concurrency = max(1, background_concurrency)
+        # Set by the tools package to the ContextVar holding the running tool's priority
+        self.current_priority: Optional[ContextVar] = None
+        self.in_flight = {priority: 0 for priority in PRIORITIES}
+        self.waiters: dict[str, deque[asyncio.Future]] = {
+            priority: deque() for priority in PRIORITIES
+        }
+        self.stats = {
+            priority: {"requests": 0, "queued": 0, "wait_ms": 0.0}
+            for priority in PRIORITIES
+        }
+
+    @classmethod
+    def from_env(cls) -> "RequestScheduler":
+        return cls(
+            max_concurrency=int(os.getenv("REST_MAX_CONCURRENCY", "10")),
+            background_concurrency=int(os.getenv("REST_BACKGROUND_CONCURRENCY", "2")),
+        )
+
+    def install(self, http):
+        """Wrap the HTTP client's request method so every request is admitted first."""
+        request = http.request
+
+        async def scheduled_request(route, **kwargs):
+            priority = self.current_priority.get() if self.current_priority else None
+            priority = priority if priority in PRIORITIES else "normal"
+            await self.acquire(priority)
+            try:
+                return await request(route, **kwargs)
+            finally:
+                self.release(priority)
+
+        http.request = scheduled_request
+
+    def _can_start(self, priority: str) -> bool:
+        if sum(self.in_flight.values()) >= self.max_concurrency:
+            return False
+        rank = PRIORITIES.index(priority)
+        if any(self.waiters[higher] for higher in PRIORITIES[:rank]):
+            return False
+        if priority == "background":
+            return (
+                not self.in_flight["interactive"]
+                and self.in_flight["background"] < self.background_concurrency
+            )
+        return True
+
+    async def acquire(self, priority: str):
+        stats = self.stats[priority]
+        stats["requests"] += 1
+        if not self.waiters[priority] and self._can_start(priority):
+            self.in_flight[priority] += 1
+            return
+
+        stats["queued"] += 1
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[priority].append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just before being cancelled
+                self.release(priority)
+            else:
+                self.waiters[priority].remove(future)
+                self._wake()
+            raise
+        finally:
+            stats["wait_ms"] += (time.perf_counter() - started) * 1000
+
+    def release(self, priority: str):
+        self.in_flight[priority] -= 1
+        self._wake()
+
+    def _wake(self):
+        for priority in PRIORITIES:
+            waiters = self.waiters[priority]
+            while waiters and self._can_start(priority):
+                future = waiters.popleft()
+                if future.done():
+                    continue
+                self.in_flight[priority] += 1
+                future.set_result(None)
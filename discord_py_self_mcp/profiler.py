@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+from .paths import data_dir
+
+
+class SamplingProfiler:
+    """Samples the event loop thread's stack from a background thread and
+    writes the result in the folded format read by flamegraph.pl and
+    speedscope ("outer;inner;leaf count" per line).
+
+    Only available when PROFILER is set, since a profile exposes code paths
+    and file names to whoever can call the tool.
+    """
+
+    def __init__(self, enabled: bool = False, interval: float = 0.005, max_seconds: float = 120.0):
+        self.enabled = enabled
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.running = False
+
+    @classmethod
+    def from_env(cls) -> "SamplingProfiler":
+        return cls(
+            enabled=os.getenv("PROFILER", "false").lower() in ("1", "true", "on"),
+            interval=float(os.getenv("PROFILER_INTERVAL_MS", "5")) / 1000,
+        )
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self, thread_id: int, seconds: float, stacks: Counter):
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                stacks[";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    async def profile(self, seconds: float, path: Optional[Path] = None) -> tuple[Path, Counter]:
+        """Profile the running event loop for the given time and write the
+        folded stacks to path (default: a timestamped file in the data dir)."""
+        if self.running:
+            raise RuntimeError("A profile is already being captured")
+        seconds = min(seconds, self.max_seconds)
+        path = path or data_dir() / f"profile-{time.strftime('%Y%m%d-%H%M%S')}.folded"
+        stacks: Counter = Counter()
+        self.running = True
+        try:
+            await asyncio.to_thread(self._sample, threading.get_ident(), seconds, stacks)
+        finally:
+            self.running = False
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in stacks.most_common()))
+        return path, stacks
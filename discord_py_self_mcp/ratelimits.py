@@ -0,0 +1,173 @@
+import os
+import time
+import logging
+from contextvars import ContextVar
+from typing import Optional
+from discord import http as discord_http
+
+logger = logging.getLogger(__name__)
+
+# Route key of the REST request being made, for attributing bucket waits
+_current_route: ContextVar[Optional[str]] = ContextVar("_current_route", default=None)
+
+
+class _RouteStats:
+    __slots__ = ("calls", "errors", "total_ms", "max_ms", "throttled_ms", "rate_limited")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.throttled_ms = 0.0
+        self.rate_limited = 0
+
+
+class _RateLimitLogHandler(logging.Handler):
+    """Picks 429 responses out of discord.http's log records, which are
+    emitted from inside the request that was limited."""
+
+    def __init__(self, monitor: "RateLimitMonitor"):
+        super().__init__(level=logging.WARNING)
+        self.monitor = monitor
+
+    def emit(self, record: logging.LogRecord):
+        message = record.msg
+        if not isinstance(message, str) or not record.args:
+            return
+        if message.startswith("We are being rate limited.") and "Retrying in" in message:
+            self.monitor.record_429(float(record.args[-1]))
+        elif message.startswith("Global rate limit has been hit."):
+            self.monitor.stats["global_limits"] += 1
+
+
+class RateLimitMonitor:
+    """Records REST calls per route and per tool, the time requests spent
+    waiting on rate limit buckets or sleeping after a 429, and exposes the
+    HTTP client's current bucket state.
+    """
+
+    def __init__(self, log_threshold_ms: float = 1000.0):
+        self.log_threshold_ms = log_threshold_ms
+        self.http = None
+        # Set by the tools package to the ContextVar naming the running tool
+        self.current_tool: Optional[ContextVar] = None
+        self.routes: dict[str, _RouteStats] = {}
+        self.tools: dict[str, _RouteStats] = {}
+        self.stats = {
+            "requests": 0,
+            "rate_limited": 0,
+            "global_limits": 0,
+            "bucket_wait_ms": 0.0,
+            "retry_sleep_ms": 0.0,
+        }
+        self.log_handler = _RateLimitLogHandler(self)
+
+    @classmethod
+    def from_env(cls) -> "RateLimitMonitor":
+        return cls(log_threshold_ms=float(os.getenv("RATE_LIMIT_LOG_MS", "1000")))
+
+    def install(self, http):
+        """Wrap the HTTP client's request method and rate limit buckets."""
+        self.http = http
+        request = http.request
+
+        async def monitored_request(route, **kwargs):
+            token = _current_route.set(route.key)
+            started = time.perf_counter()
+            failed = False
+            try:
+                return await request(route, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                _current_route.reset(token)
+                self._record_request(route.key, (time.perf_counter() - started) * 1000, failed)
+
+        http.request = monitored_request
+
+        # Buckets are created per route inside the library, so waits are
+        # measured on the class
+        if not getattr(discord_http.Ratelimit, "_monitored", False):
+            acquire = discord_http.Ratelimit.acquire
+
+            async def monitored_acquire(bucket):
+                started = time.perf_counter()
+                try:
+                    await acquire(bucket)
+                finally:
+                    self.record_wait((time.perf_counter() - started) * 1000)
+
+            discord_http.Ratelimit.acquire = monitored_acquire
+            discord_http.Ratelimit._monitored = True
+
+        logging.getLogger(discord_http.__name__).addHandler(self.log_handler)
+
+    def _tool(self) -> str:
+        tool = self.current_tool.get() if self.current_tool else None
+        return tool or "(gateway/internal)"
+
+    def _record_request(self, route: str, elapsed_ms: float, failed: bool):
+        self.stats["requests"] += 1
+        for stats in (
+            self.routes.setdefault(route, _RouteStats()),
+            self.tools.setdefault(self._tool(), _RouteStats()),
+        ):
+            stats.calls += 1
+            stats.errors += failed
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+
+    def record_wait(self, waited_ms: float):
+        if waited_ms < 1:
+            return
+        route = _current_route.get() or "(unknown)"
+        self.stats["bucket_wait_ms"] += waited_ms
+        self.routes.setdefault(route, _RouteStats()).throttled_ms += waited_ms
+        self.tools.setdefault(self._tool(), _RouteStats()).throttled_ms += waited_ms
+        if waited_ms >= self.log_threshold_ms:
+            logger.warning(f"{self._tool()} waited {waited_ms:.0f} ms on the rate limit bucket for {route}")
+
+    def record_429(self, retry_after: float):
+        route = _current_route.get() or "(unknown)"
+        self.stats["rate_limited"] += 1
+        self.stats["retry_sleep_ms"] += retry_after * 1000
+        for stats in (
+            self.routes.setdefault(route, _RouteStats()),
+            self.tools.setdefault(self._tool(), _RouteStats()),
+        ):
+            stats.rate_limited += 1
+            stats.throttled_ms += retry_after * 1000
+
+    def buckets(self) -> list[dict]:
+        """Current state of the HTTP client's rate limit buckets, most constrained first."""
+        if self.http is None:
+            return []
+        routes_by_hash: dict[str, list[str]] = {}
+        for route, bucket_hash in self.http._bucket_hashes.items():
+            routes_by_hash.setdefault(bucket_hash, []).append(route)
+
+        loop_time = None
+        buckets = []
+        for key, bucket in list(self.http._buckets.items()):
+            if loop_time is None:
+                loop_time = bucket._loop.time()
+            bucket_hash = key.split(":", 1)[0]
+            reset_in = max(0.0, bucket.expires - loop_time) if bucket.expires else 0.0
+            buckets.append(
+                {
+                    "key": key,
+                    "routes": routes_by_hash.get(bucket_hash) or [bucket_hash],
+                    "limit": bucket.limit,
+                    "remaining": bucket.remaining,
+                    "reset_in": round(reset_in, 2),
+                    "pending": len(bucket._pending_requests),
+                }
+            )
+        buckets.sort(key=lambda b: (b["remaining"] > 0, -b["pending"], b["remaining"]))
+        return buckets
+
+    def global_limited(self) -> bool:
+        over = getattr(self.http, "_global_over", None)
+        return bool(over) and not over.is_set()
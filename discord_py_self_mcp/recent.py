@@ -0,0 +1,280 @@
+import os
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Iterable, Optional
+import discord
+
+# Rough per-record overhead (slots object, author, id) used for the byte budget
+_RECORD_BYTES = 240
+_ATTACHMENT_BYTES = 160
+_EMBED_BYTES = 400
+
+
+class RecentAuthor:
+    __slots__ = ("id", "name", "display_name", "bot")
+
+    def __init__(self, user: discord.abc.User):
+        self.id = user.id
+        self.name = user.name
+        self.display_name = user.display_name
+        self.bot = user.bot
+
+
+class RecentMessage:
+    """Compact copy of a gateway message with what read_messages renders."""
+
+    __slots__ = ("id", "channel_id", "author", "content", "edited_at", "attachments", "embeds", "reference", "size")
+
+    def __init__(self, message: discord.Message):
+        self.id = message.id
+        self.channel_id = message.channel.id
+        self.author = RecentAuthor(message.author)
+        self.content = message.content
+        self.edited_at = message.edited_at.isoformat() if message.edited_at else None
+        self.attachments = tuple(
+            {
+                "id": str(attachment.id),
+                "filename": attachment.filename,
+                "url": attachment.url,
+                "size": attachment.size,
+                "content_type": attachment.content_type,
+            }
+            for attachment in message.attachments
+        )
+        self.embeds = tuple(embed.to_dict() for embed in message.embeds)
+        reference = message.reference
+        self.reference = (
+            {
+                "message_id": str(reference.message_id) if reference.message_id else None,
+                "channel_id": str(reference.channel_id) if reference.channel_id else None,
+                "guild_id": str(reference.guild_id) if reference.guild_id else None,
+            }
+            if reference
+            else None
+        )
+        self.size = self._size()
+
+    def _size(self) -> int:
+        return (
+            _RECORD_BYTES
+            + len(self.content)
+            + _ATTACHMENT_BYTES * len(self.attachments)
+            + _EMBED_BYTES * len(self.embeds)
+        )
+
+    @property
+    def created_at(self):
+        return discord.utils.snowflake_time(self.id)
+
+    def update(self, data: dict) -> int:
+        """Apply a MESSAGE_UPDATE payload; returns the change in size."""
+        before = self.size
+        if "content" in data:
+            self.content = data["content"]
+        if data.get("edited_timestamp"):
+            self.edited_at = data["edited_timestamp"]
+        if "embeds" in data:
+            self.embeds = tuple(data["embeds"])
+        self.size = self._size()
+        return self.size - before
+
+    def to_dict(self) -> dict:
+        return {
+            "id": str(self.id),
+            "channel_id": str(self.channel_id),
+            "author": {
+                "id": str(self.author.id),
+                "name": self.author.name,
+                "display_name": self.author.display_name,
+                "bot": self.author.bot,
+            },
+            "content": self.content,
+            "timestamp": self.created_at.isoformat(),
+            "edited_timestamp": self.edited_at,
+            "attachments": list(self.attachments),
+            "embeds": list(self.embeds),
+            "reference": self.reference,
+        }
+
+
+class ChannelBuffer:
+    """Recent messages of one channel, oldest first. Every message newer
+    than floor is present; older ones are unknown (floor 0 means the buffer
+    reaches back to the start of the channel).
+    """
+
+    __slots__ = ("ids", "records", "floor", "bytes")
+
+    def __init__(self, floor: int):
+        self.ids: list[int] = []
+        self.records: list[RecentMessage] = []
+        self.floor = floor
+        self.bytes = 0
+
+    def insert(self, record: RecentMessage) -> int:
+        """Add a record unless already present; returns the bytes added."""
+        index = bisect_left(self.ids, record.id)
+        if index < len(self.ids) and self.ids[index] == record.id:
+            return 0
+        self.ids.insert(index, record.id)
+        self.records.insert(index, record)
+        self.bytes += record.size
+        return record.size
+
+    def trim(self, max_messages: int) -> int:
+        """Drop the oldest records beyond max_messages; returns the bytes freed."""
+        excess = len(self.ids) - max_messages
+        if excess <= 0:
+            return 0
+        freed = sum(record.size for record in self.records[:excess])
+        # Everything after the last dropped message is still present
+        self.floor = max(self.floor, self.ids[excess - 1])
+        del self.ids[:excess]
+        del self.records[:excess]
+        self.bytes -= freed
+        return freed
+
+
+class RecentMessages:
+    """Per-channel ring buffers of messages seen on the gateway, so recent
+    history can be read without REST.
+
+    A channel's buffer starts at the first message received for it and is
+    kept current by message create, edit and delete events. Reads of the
+    newest page over REST seed it further back for channels in the gateway
+    cache. Each buffer holds at most max_messages; when all buffers together
+    exceed max_bytes, the least recently used channels are dropped.
+    """
+
+    def __init__(self, client: discord.Client, max_messages: int = 200, max_bytes: int = 8 * 2**20):
+        self.client = client
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.channels: OrderedDict[int, ChannelBuffer] = OrderedDict()
+        self.bytes = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "seeded": 0,
+            "evicted_channels": 0,
+        }
+
+    @classmethod
+    def from_env(cls, client: discord.Client) -> "RecentMessages":
+        return cls(
+            client,
+            max_messages=int(os.getenv("RECENT_MESSAGES_PER_CHANNEL", "200")),
+            max_bytes=int(os.getenv("RECENT_MESSAGES_MAX_MB", "8")) * 2**20,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_messages > 0
+
+    @property
+    def records(self) -> int:
+        return sum(len(buffer.ids) for buffer in self.channels.values())
+
+    def _buffer(self, channel_id: int, floor: int) -> ChannelBuffer:
+        buffer = self.channels.get(channel_id)
+        if buffer is None:
+            buffer = self.channels[channel_id] = ChannelBuffer(floor)
+        else:
+            self.channels.move_to_end(channel_id)
+        return buffer
+
+    def _add(self, buffer: ChannelBuffer, messages: Iterable[discord.Message]):
+        for message in messages:
+            self.bytes += buffer.insert(RecentMessage(message))
+        self.bytes -= buffer.trim(self.max_messages)
+        while self.bytes > self.max_bytes and len(self.channels) > 1:
+            _, evicted = self.channels.popitem(last=False)
+            self.bytes -= evicted.bytes
+            self.stats["evicted_channels"] += 1
+
+    def add(self, message: discord.Message):
+        if not self.enabled:
+            return
+        # Nothing before the first message seen for a channel is known
+        self._add(self._buffer(message.channel.id, message.id - 1), [message])
+
+    def seed(self, channel_id: int, messages: list[discord.Message], floor: int):
+        """Merge history fetched over REST that is complete from floor up to
+        the newest message. Only channels in the gateway cache are seeded,
+        since the gateway keeps those current afterwards."""
+        if not self.enabled or self.client.get_channel(channel_id) is None:
+            return
+        buffer = self._buffer(channel_id, floor)
+        buffer.floor = min(buffer.floor, floor)
+        self._add(buffer, messages)
+        self.stats["seeded"] += 1
+
+    def update(self, channel_id: int, message_id: int, data: dict):
+        buffer = self.channels.get(channel_id)
+        if buffer is None:
+            return
+        index = bisect_left(buffer.ids, message_id)
+        if index < len(buffer.ids) and buffer.ids[index] == message_id:
+            delta = buffer.records[index].update(data)
+            buffer.bytes += delta
+            self.bytes += delta
+
+    def remove(self, channel_id: int, message_ids: Iterable[int]):
+        buffer = self.channels.get(channel_id)
+        if buffer is None:
+            return
+        for message_id in message_ids:
+            index = bisect_left(buffer.ids, message_id)
+            if index < len(buffer.ids) and buffer.ids[index] == message_id:
+                del buffer.ids[index]
+                record = buffer.records.pop(index)
+                buffer.bytes -= record.size
+                self.bytes -= record.size
+
+    def forget(self, channel_id: int):
+        buffer = self.channels.pop(channel_id, None)
+        if buffer is not None:
+            self.bytes -= buffer.bytes
+
+    def clear(self):
+        self.channels.clear()
+        self.bytes = 0
+
+    def window(
+        self,
+        channel,
+        limit: int,
+        before: Optional[int] = None,
+        after: Optional[int] = None,
+    ) -> Optional[list[RecentMessage]]:
+        """The messages channel.history(limit, before, after) would return,
+        oldest first, or None when the buffer does not cover the window."""
+        buffer = self.channels.get(channel.id)
+        if buffer is None or limit <= 0:
+            self.stats["misses"] += 1
+            return None
+        # The gateway keeps last_message_id current; a newer id than the
+        # buffer knows means events were missed
+        newest = buffer.ids[-1] if buffer.ids else buffer.floor
+        last_message_id = getattr(channel, "last_message_id", None)
+        if last_message_id is not None and last_message_id > newest:
+            self.stats["misses"] += 1
+            return None
+
+        end = bisect_left(buffer.ids, before) if before is not None else len(buffer.ids)
+        if after is not None:
+            if after < buffer.floor:
+                self.stats["misses"] += 1
+                return None
+            start = bisect_right(buffer.ids, after)
+            records = buffer.records[start:end][:limit]
+        else:
+            start = end - limit
+            if start < 0 and buffer.floor:
+                self.stats["misses"] += 1
+                return None
+            records = buffer.records[max(start, 0):end]
+
+        self.channels.move_to_end(channel.id)
+        self.stats["hits"] += 1
+        return records
@@ -0,0 +1,128 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+import discord
+
+
+class ChannelResolver:
+    """Resolves channel ids via the gateway cache, then a bounded LRU of
+    channels fetched over REST. NotFound/Forbidden results are remembered
+    for a while so bad ids do not hit REST on every call.
+    """
+
+    def __init__(self, client: discord.Client, maxsize: int = 512, negative_ttl: float = 300.0):
+        self.client = client
+        self.maxsize = maxsize
+        self.negative_ttl = negative_ttl
+        self.channels: OrderedDict[int, discord.abc.Snowflake] = OrderedDict()
+        self.failures: dict[int, tuple[float, discord.HTTPException]] = {}
+        self.stats = {
+            "gateway_hits": 0,
+            "lru_hits": 0,
+            "negative_hits": 0,
+            "rest_fetches": 0,
+            "rest_failures": 0,
+        }
+
+    @classmethod
+    def from_env(cls, client: discord.Client) -> "ChannelResolver":
+        return cls(
+            client,
+            maxsize=int(os.getenv("CHANNEL_CACHE_SIZE", "512")),
+            negative_ttl=float(os.getenv("CHANNEL_NEGATIVE_TTL", "300")),
+        )
+
+    async def resolve(self, channel_id: int):
+        """Return the channel, raising discord.NotFound/Forbidden if it cannot be accessed."""
+        with self.client.tracer.span("resolve_channel", channel_id=channel_id):
+            return await self._resolve(channel_id)
+
+    async def _resolve(self, channel_id: int):
+        channel = self.client.get_channel(channel_id)
+        if channel:
+            self.stats["gateway_hits"] += 1
+            return channel
+
+        channel = self.channels.get(channel_id)
+        if channel:
+            self.channels.move_to_end(channel_id)
+            self.stats["lru_hits"] += 1
+            return channel
+
+        failure = self.failures.get(channel_id)
+        if failure:
+            expires, error = failure
+            if expires > time.monotonic():
+                self.stats["negative_hits"] += 1
+                raise error
+            del self.failures[channel_id]
+
+        try:
+            channel = await self.client.fetch_channel(channel_id)
+        except (discord.NotFound, discord.Forbidden) as e:
+            self.stats["rest_failures"] += 1
+            self.failures[channel_id] = (time.monotonic() + self.negative_ttl, e)
+            raise
+
+        self.stats["rest_fetches"] += 1
+        self.channels[channel_id] = channel
+        if len(self.channels) > self.maxsize:
+            self.channels.popitem(last=False)
+        return channel
+
+    def invalidate(self, channel_id: int):
+        self.channels.pop(channel_id, None)
+        self.failures.pop(channel_id, None)
+
+    def clear_failures(self):
+        self.failures.clear()
+
+
+class MessageResolver:
+    """Resolves messages via the client's gateway message cache, then a
+    bounded LRU of messages fetched over REST, before calling fetch_message.
+    """
+
+    def __init__(self, client: discord.Client, maxsize: int = 256):
+        self.client = client
+        self.maxsize = maxsize
+        self.messages: OrderedDict[int, discord.Message] = OrderedDict()
+        self.stats = {"gateway_hits": 0, "lru_hits": 0, "rest_fetches": 0}
+
+    @classmethod
+    def from_env(cls, client: discord.Client) -> "MessageResolver":
+        return cls(client, maxsize=int(os.getenv("MESSAGE_CACHE_SIZE", "256")))
+
+    async def resolve(self, channel: discord.abc.Messageable, message_id: int) -> discord.Message:
+        with self.client.tracer.span("resolve_message", message_id=message_id):
+            return await self._resolve(channel, message_id)
+
+    def cached(self, channel: discord.abc.Messageable, message_id: int) -> Optional[discord.Message]:
+        """Return the message if it can be resolved without REST, else None."""
+        message = self.client._connection._get_message(message_id)
+        if message and message.channel.id == channel.id:
+            self.stats["gateway_hits"] += 1
+            return message
+
+        message = self.messages.get(message_id)
+        if message and message.channel.id == channel.id:
+            self.messages.move_to_end(message_id)
+            self.stats["lru_hits"] += 1
+            return message
+        return None
+
+    async def _resolve(self, channel: discord.abc.Messageable, message_id: int) -> discord.Message:
+        message = self.cached(channel, message_id)
+        if message:
+            return message
+
+        message = await channel.fetch_message(message_id)
+        self.stats["rest_fetches"] += 1
+        self.messages[message_id] = message
+        if len(self.messages) > self.maxsize:
+            self.messages.popitem(last=False)
+        return message
+
+    def invalidate(self, message_id: int):
+        self.messages.pop(message_id, None)
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import logging
+from pathlib import Path
+from typing import Optional
+from .paths import data_dir
+
+logger = logging.getLogger(__name__)
+
+# Dispatches that never change cached state
+SKIP_EVENTS = {"TYPING_START"}
+
+
+class ResumeStore:
+    """Persists the gateway session (id, sequence, resume URL) together with a
+    journal of the dispatches received in it.
+
+    A RESUME only replays events missed since the saved sequence, so a new
+    process first rebuilds its cache by feeding the journal (starting at
+    READY) through the connection's parsers, then resumes instead of
+    IDENTIFYing and downloading READY again.
+    """
+
+    def __init__(self, directory: Path, window: float = 300.0, max_journal_bytes: int = 64 * 2**20):
+        self.state_path = directory / "gateway_session.json"
+        self.journal_path = directory / "gateway_journal.jsonl"
+        self.window = window
+        self.max_journal_bytes = max_journal_bytes
+        self.journal = None
+        self.journal_size = 0
+        self.parsers: dict = {}
+
+    @classmethod
+    def from_env(cls) -> Optional["ResumeStore"]:
+        if os.getenv("GATEWAY_RESUME", "false").lower() not in ("1", "true", "on"):
+            return None
+        return cls(
+            data_dir(),
+            window=float(os.getenv("GATEWAY_RESUME_WINDOW", "300")),
+            max_journal_bytes=int(os.getenv("GATEWAY_JOURNAL_MAX_MB", "64")) * 2**20,
+        )
+
+    def install(self, state):
+        """Wrap the connection's dispatch parsers so each event is journaled."""
+        self.parsers = dict(state.parsers)
+        for event, parser in self.parsers.items():
+            state.parsers[event] = self._wrap(event, parser)
+
+    def _wrap(self, event: str, parser):
+        def parse(data):
+            self._record(event, data)
+            parser(data)
+        return parse
+
+    def _record(self, event: str, data):
+        if event == "READY":
+            # A new session starts; anything journaled before is obsolete
+            self._open_journal("w")
+        if self.journal is None or event in SKIP_EVENTS:
+            return
+
+        line = json.dumps([event, data], separators=(",", ":")) + "\n"
+        self.journal.write(line)
+        self.journal_size += len(line)
+        if self.journal_size > self.max_journal_bytes:
+            logger.info("Gateway journal exceeded its size limit; RESUME disabled for this session")
+            self._close_journal()
+            self.journal_path.unlink(missing_ok=True)
+
+    def _open_journal(self, mode: str):
+        self._close_journal()
+        self.journal = open(self.journal_path, mode, encoding="utf-8")
+        self.journal_size = self.journal.tell() if mode == "a" else 0
+
+    def _close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def save(self, ws):
+        """Persist the websocket's session so another process can resume it."""
+        if ws is None or not ws.session_id or self.journal is None:
+            self.discard()
+            return
+        self.journal.flush()
+        state = {
+            "session_id": ws.session_id,
+            "sequence": ws.sequence,
+            "gateway": str(ws.gateway),
+            "saved_at": time.time(),
+        }
+        tmp_path = self.state_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(state))
+        os.replace(tmp_path, self.state_path)
+
+    def discard(self):
+        """Forget the saved session, e.g. once a live connection has taken over."""
+        self.state_path.unlink(missing_ok=True)
+
+    def load(self) -> Optional[dict]:
+        """Return the saved session if it is still inside the resume window."""
+        try:
+            state = json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return None
+        self.discard()
+        if time.time() - state.get("saved_at", 0) > self.window:
+            return None
+        if not self.journal_path.exists():
+            return None
+        return state
+
+    def replay(self, state):
+        """Rebuild the connection's cache from the journal without dispatching events."""
+        dispatch = state.dispatch
+        state.dispatch = lambda *args, **kwargs: None
+        try:
+            with open(self.journal_path, encoding="utf-8") as journal:
+                for line in journal:
+                    event, data = json.loads(line)
+                    self.parsers[event](data)
+        finally:
+            state.dispatch = dispatch
+
+        # READY_SUPPLEMENTAL schedules guild subscriptions and chunking, which
+        # a resumed session already has
+        if state._ready_task is not None:
+            state._ready_task.cancel()
+            state._ready_task = None
+        self._open_journal("a")
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import logging
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+# Imported first by main, so this approximates process spawn
+STARTED = time.perf_counter()
+
+# First time each startup milestone was reached, in ms since STARTED
+milestones: dict[str, float] = {}
+
+
+def mark(name: str) -> float:
+    """Record the first time a startup milestone is reached."""
+    if name not in milestones:
+        milestones[name] = (time.perf_counter() - STARTED) * 1000
+    return milestones[name]
+
+
+def check_budget():
+    """Log how long it took to serve list_tools, warning when over STARTUP_BUDGET_MS."""
+    if "list_tools" in milestones:
+        return
+    elapsed = mark("list_tools")
+    budget = float(os.getenv("STARTUP_BUDGET_MS", "1500"))
+    if elapsed > budget:
+        logger.warning(f"list_tools served {elapsed:.0f} ms after start (budget {budget:.0f} ms)")
+    else:
+        logger.info(f"list_tools served {elapsed:.0f} ms after start")
+
+
+def import_report(top: int = 25) -> str:
+    """Run a fresh interpreter with -X importtime and summarize the slowest imports."""
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import discord_py_self_mcp.main, discord_py_self_mcp.tools",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    rows = []
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        cumulative = int(cumulative_us)
+        # Nested imports are indented; top-level ones add up to the total
+        if not name.startswith("  "):
+            total += cumulative
+        rows.append((cumulative, int(self_us), name.strip()))
+
+    rows.sort(reverse=True)
+    lines = [f"total import time: {total / 1000:.1f} ms", "cumulative ms   self ms  module"]
+    lines += [f"{c / 1000:13.1f} {s / 1000:9.1f}  {name}" for c, s, name in rows[:top]]
+    if proc.returncode != 0:
+        lines.append(f"import failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    return "\n".join(lines)
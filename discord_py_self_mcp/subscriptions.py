@@ -0,0 +1,301 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Callable, Iterable, Optional
+import discord
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ("message", "edit", "delete")
+
+URI_PREFIX = "discord://subscriptions/"
+
+
+class Subscription:
+    """Events matching a set of filters, buffered until the session reads
+    them. The buffer keeps the newest events: when it is full the oldest
+    one is dropped and counted in dropped.
+
+    Each filter set is a whitelist; empty means any. An event must match
+    every non-empty set.
+    """
+
+    def __init__(
+        self,
+        subscription_id: str,
+        session: str,
+        channel_ids: set[int],
+        guild_ids: set[int],
+        author_ids: set[int],
+        events: set[str],
+        include_self: bool,
+        buffer_size: int,
+    ):
+        self.id = subscription_id
+        self.session = session
+        self.channel_ids = channel_ids
+        self.guild_ids = guild_ids
+        self.author_ids = author_ids
+        self.events = events
+        self.include_self = include_self
+        self.buffer: deque[dict] = deque(maxlen=buffer_size)
+        self.created = time.time()
+        self.delivered = 0
+        self.dropped = 0
+        # Set by resources/subscribe and cleared by resources/unsubscribe,
+        # as MCP only allows update notifications for subscribed resources;
+        # polling works either way
+        self.notify = False
+        # Set once an update notification is sent, cleared when the buffer
+        # is read, so a burst of messages produces one notification
+        self.notified = False
+        self.waiter = asyncio.Event()
+
+    @property
+    def uri(self) -> str:
+        return URI_PREFIX + self.id
+
+    def matches(self, event: str, channel_id: int, guild_id: Optional[int], author_id: Optional[int]) -> bool:
+        if event not in self.events:
+            return False
+        if self.channel_ids and channel_id not in self.channel_ids:
+            return False
+        if self.guild_ids and guild_id not in self.guild_ids:
+            return False
+        # Deletes of uncached messages have no author and only match when
+        # no author filter is set
+        if self.author_ids and author_id not in self.author_ids:
+            return False
+        return True
+
+    def push(self, payload: dict):
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(payload)
+        self.waiter.set()
+
+    def drain(self, max_events: int) -> list[dict]:
+        events = [self.buffer.popleft() for _ in range(min(max_events, len(self.buffer)))]
+        self.delivered += len(events)
+        if not self.buffer:
+            self.waiter.clear()
+            self.notified = False
+        return events
+
+    def describe(self) -> dict:
+        return {
+            "id": self.id,
+            "uri": self.uri,
+            "channel_ids": sorted(str(i) for i in self.channel_ids),
+            "guild_ids": sorted(str(i) for i in self.guild_ids),
+            "author_ids": sorted(str(i) for i in self.author_ids),
+            "events": sorted(self.events),
+            "include_self": self.include_self,
+            "buffered": len(self.buffer),
+            "buffer_size": self.buffer.maxlen,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+class SubscriptionManager:
+    """Routes gateway message events to per-session subscriptions, so an
+    agent can wait for new messages instead of polling read_messages.
+
+    Listeners are called with a subscription whenever it goes from having
+    nothing unread to having new events; the MCP front end uses this to
+    send a resources/updated notification for the subscription's URI.
+    """
+
+    def __init__(self, buffer_size: int = 100, max_buffer_size: int = 1000, max_per_session: int = 10):
+        self.buffer_size = buffer_size
+        self.max_buffer_size = max_buffer_size
+        self.max_per_session = max_per_session
+        self.subscriptions: dict[str, Subscription] = {}
+        self.listeners: list[Callable[[Subscription], None]] = []
+        self.self_id: Optional[int] = None
+        self.next_id = 0
+
+    @classmethod
+    def from_env(cls) -> "SubscriptionManager":
+        return cls(
+            buffer_size=int(os.getenv("SUBSCRIPTION_BUFFER", "100")),
+            max_buffer_size=int(os.getenv("SUBSCRIPTION_MAX_BUFFER", "1000")),
+            max_per_session=int(os.getenv("SUBSCRIPTIONS_PER_SESSION", "10")),
+        )
+
+    def subscribe(
+        self,
+        session: str,
+        channel_ids: Iterable[int] = (),
+        guild_ids: Iterable[int] = (),
+        author_ids: Iterable[int] = (),
+        events: Iterable[str] = ("message",),
+        include_self: bool = False,
+        buffer_size: Optional[int] = None,
+    ) -> Subscription:
+        if len(self.for_session(session)) >= self.max_per_session:
+            raise ValueError(f"Too many subscriptions for this session (max {self.max_per_session})")
+        events = set(events)
+        unknown = events.difference(EVENT_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown event types {sorted(unknown)}, expected {list(EVENT_TYPES)}")
+        size = max(1, min(buffer_size or self.buffer_size, self.max_buffer_size))
+        self.next_id += 1
+        subscription = Subscription(
+            f"s{self.next_id}",
+            session,
+            set(channel_ids),
+            set(guild_ids),
+            set(author_ids),
+            events,
+            include_self,
+            size,
+        )
+        self.subscriptions[subscription.id] = subscription
+        return subscription
+
+    def get(self, subscription_id: str, session: str) -> Subscription:
+        subscription = self.subscriptions.get(subscription_id.removeprefix(URI_PREFIX))
+        if subscription is None or subscription.session != session:
+            raise ValueError(f"Unknown subscription {subscription_id}")
+        return subscription
+
+    def unsubscribe(self, subscription_id: str, session: str) -> Subscription:
+        subscription = self.get(subscription_id, session)
+        del self.subscriptions[subscription.id]
+        # Wake pollers so they return instead of waiting out their timeout
+        subscription.waiter.set()
+        return subscription
+
+    def for_session(self, session: str) -> list[Subscription]:
+        return [s for s in self.subscriptions.values() if s.session == session]
+
+    def close_session(self, session: str):
+        for subscription in self.for_session(session):
+            self.unsubscribe(subscription.id, session)
+
+    async def read(self, subscription_id: str, session: str, max_events: int = 100, wait: float = 0.0) -> dict:
+        """Take up to max_events buffered events, oldest first, waiting up
+        to wait seconds for one to arrive if the buffer is empty."""
+        subscription = self.get(subscription_id, session)
+        if not subscription.buffer and wait > 0:
+            try:
+                await asyncio.wait_for(subscription.waiter.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+        return {
+            "subscription": subscription.id,
+            "events": subscription.drain(max_events),
+            "remaining": len(subscription.buffer),
+            "dropped": subscription.dropped,
+        }
+
+    def _publish(self, event: str, channel_id: int, guild_id: Optional[int], author_id: Optional[int], payload: dict):
+        for subscription in self.subscriptions.values():
+            if not subscription.matches(event, channel_id, guild_id, author_id):
+                continue
+            if author_id is not None and author_id == self.self_id and not subscription.include_self:
+                continue
+            subscription.push(payload)
+            if subscription.notify and not subscription.notified:
+                subscription.notified = True
+                for listener in self.listeners:
+                    try:
+                        listener(subscription)
+                    except Exception as e:
+                        logger.warning(f"Subscription listener failed: {e}")
+
+    def on_message(self, message: discord.Message):
+        if not self.subscriptions:
+            return
+        guild_id = message.guild.id if message.guild else None
+        self._publish(
+            "message",
+            message.channel.id,
+            guild_id,
+            message.author.id,
+            {
+                "event": "message",
+                "id": str(message.id),
+                "channel_id": str(message.channel.id),
+                "guild_id": str(guild_id) if guild_id else None,
+                "author": {
+                    "id": str(message.author.id),
+                    "name": message.author.name,
+                    "display_name": message.author.display_name,
+                    "bot": message.author.bot,
+                },
+                "content": message.content,
+                "timestamp": message.created_at.isoformat(),
+                "attachments": [a.url for a in message.attachments],
+                "reference": str(message.reference.message_id)
+                if message.reference and message.reference.message_id
+                else None,
+            },
+        )
+
+    def on_edit(self, payload: discord.RawMessageUpdateEvent):
+        # Embed-only updates carry no content and are not edits by the author
+        if not self.subscriptions or "content" not in payload.data:
+            return
+        author = payload.data.get("author") or {}
+        author_id = int(author["id"]) if "id" in author else None
+        self._publish(
+            "edit",
+            payload.channel_id,
+            payload.guild_id,
+            author_id,
+            {
+                "event": "edit",
+                "id": str(payload.message_id),
+                "channel_id": str(payload.channel_id),
+                "guild_id": str(payload.guild_id) if payload.guild_id else None,
+                "author_id": str(author_id) if author_id else None,
+                "content": payload.data["content"],
+                "edited_timestamp": payload.data.get("edited_timestamp"),
+            },
+        )
+
+    def on_delete(self, channel_id: int, guild_id: Optional[int], message_ids: Iterable[int], cached: Iterable[discord.Message] = ()):
+        if not self.subscriptions:
+            return
+        authors = {message.id: message.author.id for message in cached}
+        for message_id in message_ids:
+            author_id = authors.get(message_id)
+            self._publish(
+                "delete",
+                channel_id,
+                guild_id,
+                author_id,
+                {
+                    "event": "delete",
+                    "id": str(message_id),
+                    "channel_id": str(channel_id),
+                    "guild_id": str(guild_id) if guild_id else None,
+                    "author_id": str(author_id) if author_id else None,
+                },
+            )
+
+    async def handle(self, action: str, session: str, uri: Optional[str] = None):
+        """Serve the MCP resource requests for subscriptions, in-process or
+        relayed from a daemon front end."""
+        if action == "list":
+            return [s.describe() for s in self.for_session(session)]
+        if action == "read":
+            return await self.read(uri, session)
+        if action in ("notify_on", "notify_off"):
+            self.get(uri, session).notify = action == "notify_on"
+            return None
+        raise ValueError(f"Unknown subscription action {action}")
+
+    def stats(self) -> dict:
+        subscriptions = self.subscriptions.values()
+        return {
+            "subscriptions": len(self.subscriptions),
+            "buffered": sum(len(s.buffer) for s in subscriptions),
+            "delivered": sum(s.delivered for s in subscriptions),
+            "dropped": sum(s.dropped for s in subscriptions),
+        }
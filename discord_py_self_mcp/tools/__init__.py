@@ -1,4 +1,5 @@
-from .registry import registry
+from .registry import registry, current_tool, current_priority
+from ..bot import client
 from . import messages
 from . import guilds
 from . import channels
@@ -11,4 +12,13 @@ from . import reactions
 from . import members
 from . import invites
 from . import profile
+from . import diagnostics
+from . import batch
+from . import subscriptions
 
+registry.ready = client.ready_event
+client.rate_limits.current_tool = current_tool
+client.rest_scheduler.current_priority = current_priority
+client.metrics.tool_scheduler = registry.scheduler
+registry.metrics = client.metrics
+registry.tracer = client.tracer
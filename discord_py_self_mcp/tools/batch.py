@@ -0,0 +1,86 @@
+import os
+import json
+import asyncio
+from mcp.types import TextContent
+from .registry import registry, failure, ToolFailure
+
+MAX_BATCH_SIZE = int(os.getenv("BATCH_MAX_CALLS", "50"))
+DEFAULT_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+
+
+async def _run_call(call: dict, semaphore: asyncio.Semaphore) -> dict:
+    name = call.get("name")
+    result = {"name": name}
+    if name == "batch_call":
+        result["error"] = "batch_call cannot be nested"
+        return result
+    async with semaphore:
+        try:
+            contents = await registry.call_tool(name, call.get("arguments") or {})
+        except Exception as e:
+            result["error"] = str(e)
+            return result
+    text = "\n".join(
+        content.text
+        if content.type == "text"
+        else json.dumps(content.model_dump(mode="json", exclude_none=True))
+        for content in contents
+    )
+    result["error" if isinstance(contents, ToolFailure) else "result"] = text
+    return result
+
+
+@registry.register(
+    name="batch_call",
+    description="Run several tool calls in one request; results are returned in call order",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "calls": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "arguments": {"type": "object"},
+                    },
+                    "required": ["name"],
+                },
+            },
+            "max_concurrency": {
+                "type": "integer",
+                "default": DEFAULT_CONCURRENCY,
+                "description": f"Number of calls run at the same time (max {MAX_CONCURRENCY})",
+            },
+            "sequential": {
+                "type": "boolean",
+                "default": False,
+                "description": "Run calls one after another, e.g. when later calls depend on earlier ones",
+            },
+        },
+        "required": ["calls"],
+    },
+    requires_ready=False,
+    # Only waits on its calls, which each take their own scheduler slot
+    waits=True,
+)
+async def batch_call(arguments: dict):
+    try:
+        calls = arguments["calls"]
+        if len(calls) > MAX_BATCH_SIZE:
+            return failure(f"Too many calls in batch ({len(calls)}, max {MAX_BATCH_SIZE})")
+        concurrency = 1 if arguments.get("sequential") else arguments.get(
+            "max_concurrency", DEFAULT_CONCURRENCY
+        )
+        # Nested calls also share the global in-flight cap
+        semaphore = asyncio.Semaphore(
+            max(1, min(concurrency, MAX_CONCURRENCY, registry.scheduler.max_in_flight))
+        )
+
+        # Each call still goes through registry.call_tool, so readiness
+        # checks apply per tool
+        results = await asyncio.gather(*(_run_call(call, semaphore) for call in calls))
+        return [TextContent(type="text", text=json.dumps({"results": results}))]
+    except Exception as e:
+        return failure(f"Error running batch: {str(e)}")
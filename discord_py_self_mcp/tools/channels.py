@@ -1,6 +1,6 @@
 import discord
 from mcp.types import TextContent
-from .registry import registry
+from .registry import registry, failure
 from ..bot import client
 
 @registry.register(
@@ -26,7 +26,7 @@ async def create_channel(arguments: dict):
 
         guild = client.get_guild(guild_id)
         if not guild:
-            return [TextContent(type="text", text="Guild not found")]
+            return failure("Guild not found")
 
         category = None
         if category_id:
@@ -37,11 +37,11 @@ async def create_channel(arguments: dict):
         elif channel_type == "voice":
             channel = await guild.create_voice_channel(name, category=category)
         else:
-            return [TextContent(type="text", text="Invalid channel type")]
+            return failure("Invalid channel type")
 
         return [TextContent(type="text", text=f"Created channel {channel.name} ({channel.id})")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error creating channel: {str(e)}")]
+        return failure(f"Error creating channel: {str(e)}")
 
 @registry.register(
     name="delete_channel",
@@ -59,12 +59,12 @@ async def delete_channel(arguments: dict):
         channel_id = int(arguments["channel_id"])
         channel = client.get_channel(channel_id)
         if not channel:
-             return [TextContent(type="text", text="Channel not found")]
+             return failure("Channel not found")
         
         await channel.delete()
         return [TextContent(type="text", text=f"Deleted channel {channel.name}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error deleting channel: {str(e)}")]
+        return failure(f"Error deleting channel: {str(e)}")
 
 @registry.register(
     name="list_channels",
@@ -82,7 +82,7 @@ async def list_channels(arguments: dict):
         guild_id = int(arguments["guild_id"])
         guild = client.get_guild(guild_id)
         if not guild:
-            return [TextContent(type="text", text="Guild not found")]
+            return failure("Guild not found")
         
         channels = []
         for channel in guild.channels:
@@ -90,4 +90,4 @@ async def list_channels(arguments: dict):
             
         return [TextContent(type="text", text="\n".join(channels))]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error listing channels: {str(e)}")]
+        return failure(f"Error listing channels: {str(e)}")
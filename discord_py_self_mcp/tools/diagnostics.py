@@ -0,0 +1,248 @@
+import sys
+from collections import Counter
+from mcp.types import TextContent
+from .registry import registry, failure
+from ..bot import client
+
+@registry.register(
+    name="cache_stats",
+    description="Show hit/miss counters for the local lookup caches, history paging, tool scheduling and subscriptions",
+    input_schema={
+        "type": "object",
+        "properties": {}
+    },
+    requires_ready=False
+)
+async def cache_stats(arguments: dict):
+    try:
+        resolver = client.channel_resolver
+        stats = dict(resolver.stats)
+        stats["rest_lookups_saved"] = stats["lru_hits"] + stats["negative_hits"]
+        stats["lru_size"] = len(resolver.channels)
+        stats["negative_size"] = len(resolver.failures)
+
+        lines = ["channels:"] + [f"  {key}: {value}" for key, value in stats.items()]
+
+        message_resolver = client.message_resolver
+        stats = dict(message_resolver.stats)
+        stats["rest_lookups_saved"] = stats["gateway_hits"] + stats["lru_hits"]
+        stats["lru_size"] = len(message_resolver.messages)
+        lines += ["messages:"] + [f"  {key}: {value}" for key, value in stats.items()]
+
+        catalog = client.command_catalog
+        stats = dict(catalog.stats)
+        stats["scopes"] = len(catalog.scopes)
+        lines += ["commands:"] + [f"  {key}: {value}" for key, value in stats.items()]
+
+        history = client.history
+        stats = {key: round(value) for key, value in history.stats.items()}
+        stats["avg_page_ms"] = (
+            round(history.stats["fetch_ms"] / history.stats["pages"])
+            if history.stats["pages"]
+            else 0
+        )
+        stats["read_ahead"] = history.read_ahead
+        lines += ["history:"] + [f"  {key}: {value}" for key, value in stats.items()]
+
+        recent = client.recent
+        stats = dict(recent.stats)
+        stats["channels"] = len(recent.channels)
+        stats["messages"] = recent.records
+        stats["bytes"] = recent.bytes
+        lines += ["recent:"] + [f"  {key}: {value}" for key, value in stats.items()]
+
+        stats = dict(client.user_index.stats)
+        stats["size"] = len(client.user_index)
+        lines += ["users:"] + [f"  {key}: {value}" for key, value in stats.items()]
+
+        stats = dict(client.member_index.stats)
+        stats["guilds_indexed"] = len(client.member_index.guilds)
+        stats["roles_indexed"] = sum(len(g.roles) for g in client.member_index.guilds.values())
+        lines += ["members:"] + [f"  {key}: {value}" for key, value in stats.items()]
+
+        stats = dict(client.permissions.stats)
+        stats["entries"] = len(client.permissions)
+        lines += ["permissions:"] + [f"  {key}: {value}" for key, value in stats.items()]
+
+        scheduler = registry.scheduler
+        stats = dict(scheduler.stats)
+        stats["max_in_flight"] = scheduler.max_in_flight
+        stats["active_keys"] = len(scheduler.keys)
+        lines += ["scheduler:"] + [f"  {key}: {value}" for key, value in stats.items()]
+
+        stats = client.subscriptions.stats()
+        lines += ["subscriptions:"] + [f"  {key}: {value}" for key, value in stats.items()]
+        return [TextContent(type="text", text="\n".join(lines))]
+    except Exception as e:
+        return failure(f"Error reading cache stats: {str(e)}")
+
+
+def _approx_size(obj) -> int:
+    """Size of an object plus its scalar attributes; shared objects are not followed."""
+    size = sys.getsizeof(obj)
+    names = list(getattr(obj, "__dict__", {}))
+    for cls in type(obj).__mro__:
+        names.extend(getattr(cls, "__slots__", ()))
+    for name in names:
+        value = getattr(obj, name, None)
+        if isinstance(value, (str, bytes, int, float, tuple)):
+            size += sys.getsizeof(value)
+    return size
+
+
+def _rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+@registry.register(
+    name="memory_report",
+    description="Estimate cache memory used per guild",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "limit": {"type": "integer", "default": 25, "description": "Number of guilds to list"}
+        }
+    }
+)
+async def memory_report(arguments: dict):
+    try:
+        limit = arguments.get("limit", 25)
+        state = client._connection
+
+        messages_by_guild: dict[int, list] = {}
+        for message in client.cached_messages:
+            if message.guild:
+                messages_by_guild.setdefault(message.guild.id, []).append(message)
+
+        rows = []
+        for guild in client.guilds:
+            objects = (
+                list(guild._members.values())
+                + list(guild._channels.values())
+                + list(guild._threads.values())
+                + list(guild._roles.values())
+                + list(guild.emojis)
+                + list(state._guild_presences.get(guild.id, {}).values())
+                + messages_by_guild.get(guild.id, [])
+            )
+            size = sum(_approx_size(obj) for obj in objects)
+            rows.append((size, guild))
+
+        rows.sort(key=lambda row: row[0], reverse=True)
+        total = sum(size for size, _ in rows)
+        lines = [f"guilds cached: {len(rows)}", f"estimated guild cache: {total / 2**20:.1f} MiB"]
+        rss = _rss_bytes()
+        if rss:
+            lines.append(f"process rss: {rss / 2**20:.1f} MiB")
+        if client.cache_filter:
+            dropped = sum(client.cache_filter.dropped.values())
+            lines.append(f"gateway events dropped by cache filter: {dropped}")
+
+        for size, guild in rows[:limit]:
+            lines.append(
+                f"{guild.name} ({guild.id}): {size / 2**10:.0f} KiB,"
+                f" {len(guild._members)} members, {len(guild._channels)} channels,"
+                f" {len(guild._threads)} threads, {len(messages_by_guild.get(guild.id, []))} messages"
+            )
+        return [TextContent(type="text", text="\n".join(lines))]
+    except Exception as e:
+        return failure(f"Error building memory report: {str(e)}")
+
+
+@registry.register(
+    name="rate_limit_status",
+    description="Show REST rate limit buckets and the time tools spent throttled",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "limit": {"type": "integer", "default": 10, "description": "Number of buckets, routes and tools to list"}
+        }
+    },
+    requires_ready=False
+)
+async def rate_limit_status(arguments: dict):
+    try:
+        limit = arguments.get("limit", 10)
+        monitor = client.rate_limits
+        stats = {key: round(value) for key, value in monitor.stats.items()}
+        stats["global_limit_active"] = monitor.global_limited()
+        lines = ["totals:"] + [f"  {key}: {value}" for key, value in stats.items()]
+
+        scheduler = client.rest_scheduler
+        lines.append(f"priorities (max {scheduler.max_concurrency} requests in flight):")
+        for priority, stats in scheduler.stats.items():
+            lines.append(
+                f"  {priority}: {scheduler.in_flight[priority]} in flight,"
+                f" {len(scheduler.waiters[priority])} queued, {stats['requests']} requests,"
+                f" {stats['queued']} had to wait, {stats['wait_ms']:.0f} ms waiting"
+            )
+
+        lines.append("tools (most throttled first):")
+        tools = sorted(monitor.tools.items(), key=lambda item: item[1].throttled_ms, reverse=True)
+        for name, tool in tools[:limit]:
+            lines.append(
+                f"  {name}: {tool.calls} requests, {tool.throttled_ms:.0f} ms throttled,"
+                f" {tool.rate_limited} 429s, avg {tool.total_ms / max(tool.calls, 1):.0f} ms"
+            )
+
+        lines.append("routes (most throttled first):")
+        routes = sorted(monitor.routes.items(), key=lambda item: item[1].throttled_ms, reverse=True)
+        for route, stats in routes[:limit]:
+            average = stats.total_ms / stats.calls if stats.calls else 0
+            lines.append(
+                f"  {route}: {stats.calls} requests, {stats.errors} errors,"
+                f" {stats.throttled_ms:.0f} ms throttled, {stats.rate_limited} 429s,"
+                f" avg {average:.0f} ms, max {stats.max_ms:.0f} ms"
+            )
+
+        lines.append("buckets (most constrained first):")
+        for bucket in monitor.buckets()[:limit]:
+            lines.append(
+                f"  {', '.join(bucket['routes'])}: {bucket['remaining']}/{bucket['limit']} remaining,"
+                f" resets in {bucket['reset_in']}s, {bucket['pending']} waiting"
+            )
+        return [TextContent(type="text", text="\n".join(lines))]
+    except Exception as e:
+        return failure(f"Error reading rate limit status: {str(e)}")
+
+
+@registry.register(
+    name="profile_event_loop",
+    description="Sample the event loop for a number of seconds and save a flame graph profile (requires PROFILER=1)",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "seconds": {"type": "number", "default": 10, "description": "How long to sample (max 120)"},
+            "top": {"type": "integer", "default": 10, "description": "Number of hottest functions to list"}
+        }
+    },
+    requires_ready=False,
+    waits=True
+)
+async def profile_event_loop(arguments: dict):
+    try:
+        profiler = client.profiler
+        if not profiler.enabled:
+            return failure("Profiler is disabled, set PROFILER=1 to enable it")
+
+        path, stacks = await profiler.profile(float(arguments.get("seconds", 10)))
+        samples = sum(stacks.values())
+        leaves = Counter()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+
+        lines = [f"{samples} samples written to {path} (folded stacks for flamegraph.pl / speedscope)"]
+        lines += [
+            f"  {count / max(samples, 1):6.1%}  {frame}"
+            for frame, count in leaves.most_common(arguments.get("top", 10))
+        ]
+        return [TextContent(type="text", text="\n".join(lines))]
+    except Exception as e:
+        return failure(f"Error profiling event loop: {str(e)}")
@@ -12,9 +12,6 @@ from ..bot import client
     }
 )
 async def list_guilds(arguments: dict):
-    if not client.is_ready():
-        return [TextContent(type="text", text="Bot is not ready yet")]
-    
     guilds = [f"{g.name} ({g.id})" for g in client.guilds]
     return [TextContent(type="text", text="\n".join(guilds))]
 
@@ -27,8 +24,5 @@ async def list_guilds(arguments: dict):
     }
 )
 async def get_user_info(arguments: dict):
-    if not client.is_ready():
-        return [TextContent(type="text", text="Bot is not ready yet")]
-    
     user = client.user
     return [TextContent(type="text", text=f"User: {user.name}#{user.discriminator} ({user.id})")]
@@ -1,7 +1,6 @@
 import discord
-import inspect
 from mcp.types import TextContent
-from .registry import registry
+from .registry import registry, failure
 from ..bot import client
 
 
@@ -21,6 +20,7 @@ from ..bot import client
         },
         "required": ["channel_id", "command_name"],
     },
+    priority="interactive",
 )
 async def send_slash_command(arguments: dict):
     try:
@@ -32,118 +32,69 @@ async def send_slash_command(arguments: dict):
         if command_name.startswith("/"):
             command_name = command_name[1:]
 
-        channel = client.get_channel(channel_id)
-        if not channel:
-            try:
-                channel = await client.fetch_channel(channel_id)
-            except Exception:
-                channel = None
-        if not channel:
-            return [TextContent(type="text", text="Channel not found")]
+        try:
+            channel = await client.channel_resolver.resolve(channel_id)
+        except discord.HTTPException:
+            return failure("Channel not found")
 
         if not isinstance(channel, discord.abc.Messageable):
-            return [TextContent(type="text", text="Channel is not messageable")]
+            return failure("Channel is not messageable")
 
         if not isinstance(options, dict):
-            return [TextContent(type="text", text="options must be an object")]
+            return failure("options must be an object")
 
         parts = [p for p in command_name.split(" ") if p]
         if not parts:
-            return [TextContent(type="text", text="Command name is empty")]
+            return failure("Command name is empty")
         root_name = parts[0]
         subcommand_parts = parts[1:]
 
-        async def _collect_commands(result):
-            if inspect.isawaitable(result):
-                result = await result
-            if result is None:
-                return []
-            if hasattr(result, "__aiter__"):
-                return [cmd async for cmd in result]
-            return list(result)
-
-        commands = []
-        slash_commands = getattr(channel, "slash_commands", None)
-        if callable(slash_commands):
-            try:
-                commands = await _collect_commands(slash_commands(query=root_name))
-            except Exception:
-                commands = []
-
-        application_commands = getattr(channel, "application_commands", None)
-        if not commands and callable(application_commands):
-            try:
-                commands = await _collect_commands(application_commands())
-            except Exception:
-                commands = []
-
-        if commands:
-            commands = [
-                cmd for cmd in commands if isinstance(cmd, discord.SlashCommand)
-            ]
-
-        matching = [cmd for cmd in commands if getattr(cmd, "name", None) == root_name]
-        if application_id:
-            matching = [
-                cmd
-                for cmd in matching
-                if str(getattr(cmd, "application_id", "")) == str(application_id)
-            ]
+        matching = await client.command_catalog.roots(
+            channel, root_name, int(application_id) if application_id else None
+        )
 
         if not matching:
-            return [
-                TextContent(
-                    type="text", text=f"Command '{root_name}' not found in channel"
-                )
-            ]
+            return failure(f"Command '{root_name}' not found in channel")
 
         if len(matching) > 1 and not application_id:
             choices = ", ".join(
                 f"{cmd.name} (app_id={getattr(cmd, 'application_id', 'unknown')})"
                 for cmd in matching
             )
-            return [
-                TextContent(
-                    type="text",
-                    text=f"Multiple commands named '{root_name}' found. Provide application_id. Options: {choices}",
-                )
-            ]
+            return failure(f"Multiple commands named '{root_name}' found. Provide application_id. Options: {choices}")
 
         target_command = matching[0]
 
         if subcommand_parts:
-            current = target_command
-            for part in subcommand_parts:
-                children = getattr(current, "children", []) or []
-                next_child = next(
-                    (
-                        child
-                        for child in children
-                        if getattr(child, "name", None) == part
-                    ),
-                    None,
-                )
-                if not next_child:
-                    available = (
-                        ", ".join(child.name for child in children)
-                        if children
-                        else "none"
+            current = client.command_catalog.get(
+                channel,
+                int(getattr(target_command, "application_id", 0) or 0),
+                tuple(parts),
+            )
+            if current is None:
+                # Walk the tree to report which part is missing
+                current = target_command
+                for part in subcommand_parts:
+                    children = getattr(current, "children", []) or []
+                    next_child = next(
+                        (
+                            child
+                            for child in children
+                            if getattr(child, "name", None) == part
+                        ),
+                        None,
                     )
-                    return [
-                        TextContent(
-                            type="text",
-                            text=f"Subcommand '{part}' not found under '{current.name}'. Available: {available}",
+                    if not next_child:
+                        available = (
+                            ", ".join(child.name for child in children)
+                            if children
+                            else "none"
                         )
-                    ]
-                current = next_child
+                        return failure(f"Subcommand '{part}' not found under '{current.name}'. Available: {available}")
+                    current = next_child
 
             if getattr(current, "is_group", None) and current.is_group():
-                return [
-                    TextContent(
-                        type="text",
-                        text="Subcommand group provided without a leaf subcommand",
-                    )
-                ]
+                return failure("Subcommand group provided without a leaf subcommand")
             target_command = current
 
         await target_command(channel, **options)
@@ -152,9 +103,7 @@ async def send_slash_command(arguments: dict):
         ]
 
     except Exception as e:
-        return [
-            TextContent(type="text", text=f"Error executing slash command: {str(e)}")
-        ]
+        return failure(f"Error executing slash command: {str(e)}")
 
 
 @registry.register(
@@ -174,6 +123,7 @@ async def send_slash_command(arguments: dict):
         },
         "required": ["channel_id", "message_id"],
     },
+    priority="interactive",
 )
 async def click_button(arguments: dict):
     try:
@@ -181,21 +131,19 @@ async def click_button(arguments: dict):
         message_id = int(arguments["message_id"])
         custom_id = arguments.get("custom_id")
 
-        channel = client.get_channel(channel_id)
-        if not channel:
-            try:
-                channel = await client.fetch_channel(channel_id)
-            except discord.NotFound:
-                return [TextContent(type="text", text="Channel not found")]
-            except discord.Forbidden:
-                return [TextContent(type="text", text="Access denied to channel")]
+        try:
+            channel = await client.channel_resolver.resolve(channel_id)
+        except discord.NotFound:
+            return failure("Channel not found")
+        except discord.Forbidden:
+            return failure("Access denied to channel")
 
         if not isinstance(channel, discord.abc.Messageable):
-            return [TextContent(type="text", text="Channel is not messageable")]
+            return failure("Channel is not messageable")
 
-        message = await channel.fetch_message(message_id)
+        message = await client.message_resolver.resolve(channel, message_id)
         if not message:
-            return [TextContent(type="text", text="Message not found")]
+            return failure("Message not found")
 
         # Iterate through components to find the button
         for row_idx, action_row in enumerate(message.components or []):
@@ -213,16 +161,12 @@ async def click_button(arguments: dict):
                     ):
                         result = await component.click()
                         if isinstance(result, str):
-                            return [
-                                TextContent(
-                                    type="text", text=f"Button is a URL: {result}"
-                                )
-                            ]
+                            return failure(f"Button is a URL: {result}")
                         return [TextContent(type="text", text="Button clicked")]
 
-        return [TextContent(type="text", text="Button not found")]
+        return failure("Button not found")
     except Exception as e:
-        return [TextContent(type="text", text=f"Error clicking button: {str(e)}")]
+        return failure(f"Error clicking button: {str(e)}")
 
 
 @registry.register(
@@ -247,6 +191,7 @@ async def click_button(arguments: dict):
         },
         "required": ["channel_id", "message_id", "values"],
     },
+    priority="interactive",
 )
 async def select_menu(arguments: dict):
     try:
@@ -258,20 +203,18 @@ async def select_menu(arguments: dict):
         if isinstance(values, str):
             values = [values]
         if not isinstance(values, list):
-            return [TextContent(type="text", text="values must be a list")]
+            return failure("values must be a list")
 
-        channel = client.get_channel(channel_id)
-        if not channel:
-            try:
-                channel = await client.fetch_channel(channel_id)
-            except discord.NotFound:
-                return [TextContent(type="text", text="Channel not found")]
-            except discord.Forbidden:
-                return [TextContent(type="text", text="Access denied to channel")]
+        try:
+            channel = await client.channel_resolver.resolve(channel_id)
+        except discord.NotFound:
+            return failure("Channel not found")
+        except discord.Forbidden:
+            return failure("Access denied to channel")
 
         if not isinstance(channel, discord.abc.Messageable):
-            return [TextContent(type="text", text="Channel is not messageable")]
-        message = await channel.fetch_message(message_id)
+            return failure("Channel is not messageable")
+        message = await client.message_resolver.resolve(channel, message_id)
 
         for row_idx, action_row in enumerate(message.components or []):
             for col_idx, component in enumerate(action_row.children):
@@ -299,12 +242,7 @@ async def select_menu(arguments: dict):
                                     available = ", ".join(
                                         opt.value for opt in component.options
                                     )
-                                    return [
-                                        TextContent(
-                                            type="text",
-                                            text=f"Value '{value}' not found in menu options. Available: {available}",
-                                        )
-                                    ]
+                                    return failure(f"Value '{value}' not found in menu options. Available: {available}")
                                 selected_options.append(match)
                         else:
                             selected_options = [
@@ -319,6 +257,6 @@ async def select_menu(arguments: dict):
                             )
                         ]
 
-        return [TextContent(type="text", text="Menu not found")]
+        return failure("Menu not found")
     except Exception as e:
-        return [TextContent(type="text", text=f"Error selecting menu: {str(e)}")]
+        return failure(f"Error selecting menu: {str(e)}")
@@ -1,6 +1,6 @@
 import discord
 from mcp.types import TextContent
-from .registry import registry
+from .registry import registry, failure
 from ..bot import client
 
 
@@ -20,6 +20,7 @@ from ..bot import client
         },
         "required": ["channel_id"],
     },
+    requires_ready=False,
 )
 async def create_invite(arguments: dict):
     try:
@@ -28,9 +29,10 @@ async def create_invite(arguments: dict):
         max_uses = arguments.get("max_uses", 0)
         temporary = arguments.get("temporary", False)
 
-        channel = client.get_channel(channel_id) or await client.fetch_channel(
-            channel_id
-        )
+        channel = await client.channel_resolver.resolve(channel_id)
+        denied = client.permissions.check(channel, "create_instant_invite")
+        if denied:
+            return failure(denied)
 
         invite = await channel.create_invite(
             max_age=max_age,
@@ -40,7 +42,7 @@ async def create_invite(arguments: dict):
         )
         return [TextContent(type="text", text=f"Created invite: {invite.url}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error creating invite: {str(e)}")]
+        return failure(f"Error creating invite: {str(e)}")
 
 
 @registry.register(
@@ -57,7 +59,7 @@ async def list_invites(arguments: dict):
         guild_id = int(arguments["guild_id"])
         guild = client.get_guild(guild_id)
         if not guild:
-            return [TextContent(type="text", text="Guild not found")]
+            return failure("Guild not found")
 
         invites = await guild.invites()
         invite_list = [f"{i.code} (Uses: {i.uses})" for i in invites]
@@ -67,7 +69,7 @@ async def list_invites(arguments: dict):
 
         return [TextContent(type="text", text="\n".join(invite_list))]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error listing invites: {str(e)}")]
+        return failure(f"Error listing invites: {str(e)}")
 
 
 @registry.register(
@@ -78,6 +80,7 @@ async def list_invites(arguments: dict):
         "properties": {"invite_code": {"type": "string"}},
         "required": ["invite_code"],
     },
+    requires_ready=False,
 )
 async def delete_invite(arguments: dict):
     try:
@@ -90,4 +93,4 @@ async def delete_invite(arguments: dict):
         await invite.delete()
         return [TextContent(type="text", text=f"Deleted invite {invite_code}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error deleting invite: {str(e)}")]
+        return failure(f"Error deleting invite: {str(e)}")
@@ -1,6 +1,6 @@
 import discord
 from mcp.types import TextContent
-from .registry import registry
+from .registry import registry, failure
 from ..bot import client
 
 @registry.register(
@@ -24,16 +24,22 @@ async def kick_member(arguments: dict):
         
         guild = client.get_guild(guild_id)
         if not guild:
-            return [TextContent(type="text", text="Guild not found")]
+            return failure("Guild not found")
+        denied = client.permissions.check(guild, "kick_members")
+        if denied:
+            return failure(denied)
             
         member = guild.get_member(user_id) or await guild.fetch_member(user_id)
         if not member:
-            return [TextContent(type="text", text="Member not found")]
+            return failure("Member not found")
+        denied = client.permissions.check_hierarchy(guild, member)
+        if denied:
+            return failure(denied)
             
         await member.kick(reason=reason)
         return [TextContent(type="text", text=f"Kicked member {member.name}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error kicking member: {str(e)}")]
+        return failure(f"Error kicking member: {str(e)}")
 
 @registry.register(
     name="ban_member",
@@ -58,7 +64,7 @@ async def ban_member(arguments: dict):
         
         guild = client.get_guild(guild_id)
         if not guild:
-            return [TextContent(type="text", text="Guild not found")]
+            return failure("Guild not found")
             
         # Can ban user even if not in guild
         user = discord.Object(id=user_id)
@@ -66,7 +72,7 @@ async def ban_member(arguments: dict):
         await guild.ban(user, reason=reason, delete_message_days=delete_days)
         return [TextContent(type="text", text=f"Banned user {user_id}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error banning member: {str(e)}")]
+        return failure(f"Error banning member: {str(e)}")
 
 @registry.register(
     name="unban_member",
@@ -89,14 +95,14 @@ async def unban_member(arguments: dict):
         
         guild = client.get_guild(guild_id)
         if not guild:
-            return [TextContent(type="text", text="Guild not found")]
+            return failure("Guild not found")
             
         user = discord.Object(id=user_id)
         
         await guild.unban(user, reason=reason)
         return [TextContent(type="text", text=f"Unbanned user {user_id}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error unbanning member: {str(e)}")]
+        return failure(f"Error unbanning member: {str(e)}")
 
 @registry.register(
     name="add_role",
@@ -122,12 +128,12 @@ async def add_role(arguments: dict):
         role = guild.get_role(role_id)
         
         if not role:
-            return [TextContent(type="text", text="Role not found")]
+            return failure("Role not found")
             
         await member.add_roles(role)
         return [TextContent(type="text", text=f"Added role {role.name} to {member.name}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error adding role: {str(e)}")]
+        return failure(f"Error adding role: {str(e)}")
 
 @registry.register(
     name="remove_role",
@@ -153,9 +159,130 @@ async def remove_role(arguments: dict):
         role = guild.get_role(role_id)
         
         if not role:
-            return [TextContent(type="text", text="Role not found")]
+            return failure("Role not found")
             
         await member.remove_roles(role)
         return [TextContent(type="text", text=f"Removed role {role.name} from {member.name}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error removing role: {str(e)}")]
+        return failure(f"Error removing role: {str(e)}")
+
+
+def _member_line(member: discord.Member) -> str:
+    names = member.name
+    if member.display_name != member.name:
+        names += f" ({member.display_name})"
+    return f"{names} - {member.id}"
+
+@registry.register(
+    name="list_members",
+    description="List cached members of a guild in id order, a page at a time",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "guild_id": {"type": "string"},
+            "limit": {"type": "integer", "default": 100, "description": "Members per page (max 1000)"},
+            "after": {"type": "string", "description": "Only members with a higher id, from the previous page's next_after"}
+        },
+        "required": ["guild_id"]
+    }
+)
+async def list_members(arguments: dict):
+    try:
+        guild_id = int(arguments["guild_id"])
+        limit = max(1, min(arguments.get("limit", 100), 1000))
+        after = int(arguments.get("after") or 0)
+
+        guild = client.get_guild(guild_id)
+        if not guild:
+            return failure("Guild not found")
+
+        index = client.member_index.get(guild)
+        ids = index.page(limit, after)
+        lines = [_member_line(member) for member in map(guild.get_member, ids) if member]
+        if not lines:
+            return [TextContent(type="text", text="No more members")]
+        lines.insert(0, f"{len(index.member_ids)} of {guild.member_count or '?'} members cached")
+        if len(ids) == limit:
+            lines.append(f"next_after: {ids[-1]}")
+        return [TextContent(type="text", text="\n".join(lines))]
+    except Exception as e:
+        return failure(f"Error listing members: {str(e)}")
+
+@registry.register(
+    name="search_members",
+    description="Find guild members whose username, display name or nickname starts with a query",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "guild_id": {"type": "string"},
+            "query": {"type": "string"},
+            "limit": {"type": "integer", "default": 25, "description": "Max 100"}
+        },
+        "required": ["guild_id", "query"]
+    }
+)
+async def search_members(arguments: dict):
+    try:
+        guild_id = int(arguments["guild_id"])
+        query = arguments["query"]
+        limit = max(1, min(arguments.get("limit", 25), 100))
+        if not query:
+            return failure("Query must not be empty, use list_members to page through members")
+
+        guild = client.get_guild(guild_id)
+        if not guild:
+            return failure("Guild not found")
+
+        members = await client.member_index.search(guild, query, limit)
+        if not members:
+            return [TextContent(type="text", text=f"No members matching '{query}'")]
+        return [TextContent(type="text", text="\n".join(_member_line(member) for member in members))]
+    except Exception as e:
+        return failure(f"Error searching members: {str(e)}")
+
+@registry.register(
+    name="list_role_members",
+    description="List cached members that have a role, in id order, a page at a time",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "guild_id": {"type": "string"},
+            "role_id": {"type": "string"},
+            "limit": {"type": "integer", "default": 100, "description": "Members per page (max 1000)"},
+            "after": {"type": "string", "description": "Only members with a higher id, from the previous page's next_after"}
+        },
+        "required": ["guild_id", "role_id"]
+    }
+)
+async def list_role_members(arguments: dict):
+    try:
+        guild_id = int(arguments["guild_id"])
+        role_id = int(arguments["role_id"])
+        limit = max(1, min(arguments.get("limit", 100), 1000))
+        after = int(arguments.get("after") or 0)
+
+        guild = client.get_guild(guild_id)
+        if not guild:
+            return failure("Guild not found")
+        role = guild.get_role(role_id)
+        if not role:
+            return failure("Role not found")
+
+        index = client.member_index.get(guild)
+        # Every member has @everyone, whose id is the guild's
+        if role.is_default():
+            total, ids = len(index.member_ids), index.page(limit, after)
+        else:
+            total, ids = len(index.roles.get(role_id, ())), index.role_page(role_id, limit, after)
+        lines = [_member_line(member) for member in map(guild.get_member, ids) if member]
+        if not lines:
+            return [TextContent(type="text", text=f"No more cached members with {role.name}")]
+        header = f"{total} cached members with {role.name}"
+        if not guild.chunked:
+            header += f" ({len(index.member_ids)} of {guild.member_count or '?'} guild members cached)"
+        lines.insert(0, header)
+        if len(ids) == limit:
+            lines.append(f"next_after: {ids[-1]}")
+        return [TextContent(type="text", text="\n".join(lines))]
+    except Exception as e:
+        return failure(f"Error listing role members: {str(e)}")
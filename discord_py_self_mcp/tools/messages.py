@@ -1,8 +1,19 @@
+import json
 import discord
 import discord
 from mcp.types import TextContent
-from .registry import registry
+from .registry import registry, current_session, failure
 from ..bot import client
+from ..recent import RecentMessage
+
+# Newest message id returned by read_messages, keyed by (MCP session, channel id)
+read_cursors: dict[tuple[str, int], int] = {}
+
+
+def close_session(session: str):
+    """Drop the read cursors of an MCP session that has ended."""
+    for key in [key for key in read_cursors if key[0] == session]:
+        del read_cursors[key]
 
 
 @registry.register(
@@ -16,24 +27,26 @@ from ..bot import client
         },
         "required": ["channel_id", "content"],
     },
+    requires_ready=False,
+    priority="interactive",
 )
 async def send_message(arguments: dict):
     try:
         channel_id = int(arguments["channel_id"])
         content = arguments["content"]
-        channel = client.get_channel(channel_id)
-        if not channel:
-            try:
-                channel = await client.fetch_channel(channel_id)
-            except discord.NotFound:
-                return [TextContent(type="text", text="Channel not found")]
-            except discord.Forbidden:
-                return [TextContent(type="text", text="Access denied to channel")]
-
-        if not channel:
-            return [TextContent(type="text", text="Channel not found")]
+        try:
+            channel = await client.channel_resolver.resolve(channel_id)
+        except discord.NotFound:
+            return failure("Channel not found")
+        except discord.Forbidden:
+            return failure("Access denied to channel")
+
         if not isinstance(channel, discord.abc.Messageable):
-            return [TextContent(type="text", text="Channel is not messageable")]
+            return failure("Channel is not messageable")
+        send = "send_messages_in_threads" if isinstance(channel, discord.Thread) else "send_messages"
+        denied = client.permissions.check(channel, "view_channel", send)
+        if denied:
+            return failure(denied)
 
         message = await channel.send(content)
         return [
@@ -43,46 +56,199 @@ async def send_message(arguments: dict):
             )
         ]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error sending message: {str(e)}")]
+        return failure(f"Error sending message: {str(e)}")
+
+
+def _snowflake(arguments: dict, key: str):
+    value = arguments.get(key)
+    return int(value) if value not in (None, "") else None
+
+
+def _message_to_dict(msg: discord.Message) -> dict:
+    if isinstance(msg, RecentMessage):
+        return msg.to_dict()
+    reference = msg.reference
+    return {
+        "id": str(msg.id),
+        "channel_id": str(msg.channel.id),
+        "author": {
+            "id": str(msg.author.id),
+            "name": msg.author.name,
+            "display_name": msg.author.display_name,
+            "bot": msg.author.bot,
+        },
+        "content": msg.content,
+        "timestamp": msg.created_at.isoformat(),
+        "edited_timestamp": msg.edited_at.isoformat() if msg.edited_at else None,
+        "attachments": [
+            {
+                "id": str(attachment.id),
+                "filename": attachment.filename,
+                "url": attachment.url,
+                "size": attachment.size,
+                "content_type": attachment.content_type,
+            }
+            for attachment in msg.attachments
+        ],
+        "embeds": [embed.to_dict() for embed in msg.embeds],
+        "reference": {
+            "message_id": str(reference.message_id) if reference.message_id else None,
+            "channel_id": str(reference.channel_id) if reference.channel_id else None,
+            "guild_id": str(reference.guild_id) if reference.guild_id else None,
+        }
+        if reference
+        else None,
+    }
+
+
+def _read_result(output_format: str, history: list, next_cursor, empty_text: str):
+    if output_format == "json":
+        payload = {
+            "messages": [_message_to_dict(msg) for msg in history],
+            "next_cursor": next_cursor,
+        }
+        return [TextContent(type="text", text=json.dumps(payload))]
+    if not history:
+        return [TextContent(type="text", text=empty_text)]
+    messages = [f"{msg.author.name}: {msg.content}" for msg in history]
+    return [TextContent(type="text", text="\n".join(messages))]
 
 
 @registry.register(
     name="read_messages",
-    description="Read messages from a channel",
+    description="Read messages from a channel, optionally paging with before/after/around cursors",
     input_schema={
         "type": "object",
         "properties": {
             "channel_id": {"type": "string"},
             "limit": {"type": "integer", "default": 50},
+            "since_last_read": {
+                "type": "boolean",
+                "default": False,
+                "description": "Only return messages newer than the last read_messages call on this channel",
+            },
+            "before": {
+                "type": "string",
+                "description": "Only return messages older than this message id",
+            },
+            "after": {
+                "type": "string",
+                "description": "Only return messages newer than this message id",
+            },
+            "around": {
+                "type": "string",
+                "description": "Return messages around this message id (limit at most 101)",
+            },
+            "format": {
+                "type": "string",
+                "enum": ["text", "json"],
+                "default": "text",
+                "description": "json returns message objects with embeds, attachments, reply references and a next_cursor",
+            },
         },
         "required": ["channel_id"],
     },
+    requires_ready=False,
 )
 async def read_messages(arguments: dict):
     try:
         channel_id = int(arguments["channel_id"])
         limit = arguments.get("limit", 50)
-        channel = client.get_channel(channel_id)
-        if not channel:
-            try:
-                channel = await client.fetch_channel(channel_id)
-            except discord.NotFound:
-                return [TextContent(type="text", text="Channel not found")]
-            except discord.Forbidden:
-                return [TextContent(type="text", text="Access denied to channel")]
-
-        if not channel:
-            return [TextContent(type="text", text="Channel not found")]
+        output_format = arguments.get("format", "text")
+        before_id = _snowflake(arguments, "before")
+        after_id = _snowflake(arguments, "after")
+        around_id = _snowflake(arguments, "around")
+        cursor_key = (current_session.get(), channel_id)
+        if (
+            arguments.get("since_last_read")
+            and before_id is None
+            and after_id is None
+            and around_id is None
+        ):
+            after_id = read_cursors.get(cursor_key)
+        try:
+            channel = await client.channel_resolver.resolve(channel_id)
+        except discord.NotFound:
+            return failure("Channel not found")
+        except discord.Forbidden:
+            return failure("Access denied to channel")
+
         if not isinstance(channel, discord.abc.Messageable):
-            return [TextContent(type="text", text="Channel is not messageable")]
+            return failure("Channel is not messageable")
+
+        if after_id is not None and around_id is None and client.get_channel(channel_id) is channel:
+            # The gateway keeps last_message_id current, so a quiet channel
+            # can be answered without a history request. Channels fetched
+            # over REST are never updated, so they always go to history
+            last_message_id = getattr(channel, "last_message_id", None)
+            if last_message_id is not None and last_message_id <= after_id:
+                return _read_result(
+                    output_format, [], {"after": str(after_id)}, "No new messages"
+                )
 
-        messages = []
-        async for msg in channel.history(limit=limit):
-            messages.append(f"{msg.author.name}: {msg.content}")
+        if around_id is not None:
+            limit = min(limit, 101)
+            history = [
+                msg
+                async for msg in channel.history(
+                    limit=limit, around=discord.Object(id=around_id)
+                )
+            ]
+        else:
+            # Recent windows of active channels are served from the
+            # gateway's ring buffer
+            history = client.recent.window(channel, limit, before=before_id, after=after_id)
+            if history is None:
+                async with client.history.read(
+                    channel,
+                    limit,
+                    before=discord.Object(id=before_id) if before_id else None,
+                    after=discord.Object(id=after_id) if after_id else None,
+                ) as reader:
+                    history = [msg async for msg in reader.messages()]
+                history.sort(key=lambda msg: msg.id)
+                # Pages that reach the newest message let later reads skip REST.
+                # An empty page only proves the channel is empty if limit > 0
+                if before_id is None and after_id is None and limit > 0:
+                    client.recent.seed(
+                        channel.id, history, history[0].id - 1 if len(history) >= limit else 0
+                    )
+                elif before_id is None and len(history) < limit:
+                    client.recent.seed(channel.id, history, after_id)
+        history.sort(key=lambda msg: msg.id)
 
-        return [TextContent(type="text", text="\n".join(reversed(messages)))]
+        # Pages never overlap: older pages continue before the oldest message
+        # returned, newer ones after the newest
+        if around_id is not None:
+            next_cursor = (
+                {"before": str(history[0].id), "after": str(history[-1].id)}
+                if history
+                else None
+            )
+        elif after_id is not None:
+            next_cursor = {"after": str(history[-1].id if history else after_id)}
+        else:
+            next_cursor = (
+                {"before": str(history[0].id)} if history and len(history) >= limit else None
+            )
+
+        if history:
+            newest_id = history[-1].id
+            read_cursors[cursor_key] = max(read_cursors.get(cursor_key, 0), newest_id)
+
+        empty_text = "No new messages" if after_id is not None else ""
+        with client.tracer.span("format", messages=len(history)):
+            return _read_result(output_format, history, next_cursor, empty_text)
     except Exception as e:
-        return [TextContent(type="text", text=f"Error reading messages: {str(e)}")]
+        return failure(f"Error reading messages: {str(e)}")
+
+
+def _search_result(rows: list[tuple]):
+    """Format (id, author_name, content) rows, given newest first."""
+    if not rows:
+        return [TextContent(type="text", text="No messages found matching query")]
+    lines = [f"{author}: {content}" for _, author, content in rows]
+    return [TextContent(type="text", text="\n".join(reversed(lines)))]
 
 
 @registry.register(
@@ -100,6 +266,7 @@ async def read_messages(arguments: dict):
         },
         "required": ["channel_id", "query"],
     },
+    requires_ready=False,
 )
 async def search_messages(arguments: dict):
     try:
@@ -107,34 +274,116 @@ async def search_messages(arguments: dict):
         query = arguments["query"].lower()
         limit = arguments.get("limit", 50)
 
-        channel = client.get_channel(channel_id)
-        if not channel:
-            try:
-                channel = await client.fetch_channel(channel_id)
-            except discord.NotFound:
-                return [TextContent(type="text", text="Channel not found")]
-            except discord.Forbidden:
-                return [TextContent(type="text", text="Access denied to channel")]
-
-        if not channel:
-            return [TextContent(type="text", text="Channel not found")]
+        # Archived messages are searched locally without any REST calls. The
+        # archive alone is enough when it has limit matches or holds the whole
+        # channel; otherwise recent history is scanned too and merged in
+        rows = []
+        if client.archive:
+            rows = client.archive.search(channel_id, query, limit)
+            if len(rows) >= limit or client.archive.is_complete(channel_id):
+                return _search_result(rows)
+
+        try:
+            channel = await client.channel_resolver.resolve(channel_id)
+        except discord.NotFound:
+            return failure("Channel not found")
+        except discord.Forbidden:
+            return failure("Access denied to channel")
+
         if not isinstance(channel, discord.abc.Messageable):
-            return [TextContent(type="text", text="Channel is not messageable")]
+            return failure("Channel is not messageable")
 
-        messages = []
+        found = {row[0]: row for row in rows}
+        matched = 0
+        scanned = []
         # Basic filtering using history since standard search API is not always reliable in selfbots without indexing
-        async for msg in channel.history(limit=limit * 2):  # Fetch double to filter
-            if query in msg.content.lower():
-                messages.append(f"{msg.author.name}: {msg.content}")
-                if len(messages) >= limit:
+        async with client.history.read(channel, limit * 2) as reader:  # Fetch double to filter
+            async for page in reader:
+                scanned.extend(page)
+                for msg in page:
+                    if query in msg.content.lower():
+                        found[msg.id] = (msg.id, msg.author.name, msg.content)
+                        matched += 1
+                        if matched >= limit:
+                            break
+                if matched >= limit:
                     break
 
-        if not messages:
-            return [TextContent(type="text", text="No messages found matching query")]
+        if client.archive:
+            client.archive.store_many(scanned)
 
-        return [TextContent(type="text", text="\n".join(reversed(messages)))]
+        return _search_result(sorted(found.values(), reverse=True)[:limit])
     except Exception as e:
-        return [TextContent(type="text", text=f"Error searching messages: {str(e)}")]
+        return failure(f"Error searching messages: {str(e)}")
+
+
+@registry.register(
+    name="backfill_messages",
+    description="Archive channel history locally so search_messages can find older messages",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "channel_id": {"type": "string"},
+            "limit": {"type": "integer", "default": 1000},
+            "resume": {
+                "type": "boolean",
+                "default": True,
+                "description": "Continue from the oldest archived message instead of the newest message",
+            },
+        },
+        "required": ["channel_id"],
+    },
+    requires_ready=False,
+    priority="background",
+)
+async def backfill_messages(arguments: dict):
+    try:
+        channel_id = int(arguments["channel_id"])
+        limit = arguments.get("limit", 1000)
+        resume = arguments.get("resume", True)
+
+        if not client.archive:
+            return failure("Message archive is disabled (set MESSAGE_ARCHIVE=true)")
+
+        try:
+            channel = await client.channel_resolver.resolve(channel_id)
+        except discord.NotFound:
+            return failure("Channel not found")
+        except discord.Forbidden:
+            return failure("Access denied to channel")
+
+        if not isinstance(channel, discord.abc.Messageable):
+            return failure("Channel is not messageable")
+
+        before = None
+        if resume:
+            oldest_id = client.archive.oldest_id(channel_id)
+            if oldest_id:
+                before = discord.Object(id=oldest_id)
+
+        count = 0
+        # The next page is already in flight while this one is written out
+        async with client.history.read(channel, limit, before=before) as reader:
+            async for page in reader:
+                client.archive.store_many(page)
+                count += len(page)
+
+        # Reading from the newest message back to the start archives the whole
+        # channel; gateway events keep it complete while it is gateway-tracked
+        if before is None and count < limit and client.get_channel(channel_id) is not None:
+            client.archive.mark_complete(channel_id)
+
+        latencies = reader.page_latencies
+        average = sum(latencies) / len(latencies) if latencies else 0
+        return [
+            TextContent(
+                type="text",
+                text=f"Archived {count} messages from channel {channel_id} "
+                f"({len(latencies)} pages, {average:.0f} ms/page)",
+            )
+        ]
+    except Exception as e:
+        return failure(f"Error backfilling messages: {str(e)}")
 
 
 @registry.register(
@@ -149,6 +398,7 @@ async def search_messages(arguments: dict):
         },
         "required": ["channel_id", "message_id", "content"],
     },
+    priority="interactive",
 )
 async def edit_message(arguments: dict):
     try:
@@ -156,30 +406,24 @@ async def edit_message(arguments: dict):
         message_id = int(arguments["message_id"])
         content = arguments["content"]
 
-        channel = client.get_channel(channel_id)
-        if not channel:
-            try:
-                channel = await client.fetch_channel(channel_id)
-            except discord.NotFound:
-                return [TextContent(type="text", text="Channel not found")]
-            except discord.Forbidden:
-                return [TextContent(type="text", text="Access denied to channel")]
-
-        if not channel:
-            return [TextContent(type="text", text="Channel not found")]
+        try:
+            channel = await client.channel_resolver.resolve(channel_id)
+        except discord.NotFound:
+            return failure("Channel not found")
+        except discord.Forbidden:
+            return failure("Access denied to channel")
+
         if not isinstance(channel, discord.abc.Messageable):
-            return [TextContent(type="text", text="Channel is not messageable")]
-        message = await channel.fetch_message(message_id)
+            return failure("Channel is not messageable")
+        message = await client.message_resolver.resolve(channel, message_id)
 
         if message.author.id != client.user.id:
-            return [
-                TextContent(type="text", text="Cannot edit messages from other users")
-            ]
+            return failure("Cannot edit messages from other users")
 
         await message.edit(content=content)
         return [TextContent(type="text", text=f"Edited message {message_id}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error editing message: {str(e)}")]
+        return failure(f"Error editing message: {str(e)}")
 
 
 @registry.register(
@@ -193,28 +437,42 @@ async def edit_message(arguments: dict):
         },
         "required": ["channel_id", "message_id"],
     },
+    requires_ready=False,
+    priority="interactive",
 )
 async def delete_message(arguments: dict):
     try:
         channel_id = int(arguments["channel_id"])
         message_id = int(arguments["message_id"])
 
-        channel = client.get_channel(channel_id)
-        if not channel:
-            try:
-                channel = await client.fetch_channel(channel_id)
-            except discord.NotFound:
-                return [TextContent(type="text", text="Channel not found")]
-            except discord.Forbidden:
-                return [TextContent(type="text", text="Access denied to channel")]
-
-        if not channel:
-            return [TextContent(type="text", text="Channel not found")]
+        try:
+            channel = await client.channel_resolver.resolve(channel_id)
+        except discord.NotFound:
+            return failure("Channel not found")
+        except discord.Forbidden:
+            return failure("Access denied to channel")
+
         if not isinstance(channel, discord.abc.Messageable):
-            return [TextContent(type="text", text="Channel is not messageable")]
-        message = await channel.fetch_message(message_id)
+            return failure("Channel is not messageable")
+        denied = client.permissions.check(channel, "view_channel")
+        if denied:
+            return failure(denied)
+        message = client.message_resolver.cached(channel, message_id)
+        if message is None:
+            # Only fetching the message over REST needs history access
+            denied = client.permissions.check(channel, "read_message_history")
+            if denied:
+                return failure(denied)
+            message = await client.message_resolver.resolve(channel, message_id)
 
+        # Only other people's messages need manage_messages. Before READY
+        # this account is not known yet, nor are its permissions, so
+        # Discord decides
+        if client.user is not None and message.author.id != client.user.id:
+            denied = client.permissions.check(channel, "manage_messages")
+            if denied:
+                return failure(denied)
         await message.delete()
         return [TextContent(type="text", text=f"Deleted message {message_id}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error deleting message: {str(e)}")]
+        return failure(f"Error deleting message: {str(e)}")
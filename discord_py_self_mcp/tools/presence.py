@@ -1,6 +1,6 @@
 import discord
 from mcp.types import TextContent
-from .registry import registry
+from .registry import registry, failure
 from ..bot import client
 
 @registry.register(
@@ -27,7 +27,7 @@ async def set_status(arguments: dict):
         await client.change_presence(status=status_map[status_str])
         return [TextContent(type="text", text=f"Status set to {status_str}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error setting status: {str(e)}")]
+        return failure(f"Error setting status: {str(e)}")
 
 @registry.register(
     name="set_activity",
@@ -57,4 +57,4 @@ async def set_activity(arguments: dict):
         await client.change_presence(activity=activity)
         return [TextContent(type="text", text=f"Activity set to {activity_type} {name}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error setting activity: {str(e)}")]
+        return failure(f"Error setting activity: {str(e)}")
@@ -1,6 +1,6 @@
 import discord
 from mcp.types import TextContent
-from .registry import registry
+from .registry import registry, failure
 from ..bot import client
 
 @registry.register(
@@ -29,4 +29,4 @@ async def edit_profile(arguments: dict):
         await client.user.edit(**kwargs)
         return [TextContent(type="text", text="Profile updated")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error editing profile: {str(e)}")]
+        return failure(f"Error editing profile: {str(e)}")
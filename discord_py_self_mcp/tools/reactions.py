@@ -1,6 +1,6 @@
 import discord
 from mcp.types import TextContent
-from .registry import registry
+from .registry import registry, failure
 from ..bot import client
 
 @registry.register(
@@ -14,7 +14,9 @@ from ..bot import client
             "emoji": {"type": "string", "description": "The emoji to react with (unicode or custom ID)"}
         },
         "required": ["channel_id", "message_id", "emoji"]
-    }
+    },
+    requires_ready=False,
+    priority="interactive"
 )
 async def add_reaction(arguments: dict):
     try:
@@ -22,13 +24,13 @@ async def add_reaction(arguments: dict):
         message_id = int(arguments["message_id"])
         emoji = arguments["emoji"]
         
-        channel = client.get_channel(channel_id) or await client.fetch_channel(channel_id)
-        message = await channel.fetch_message(message_id)
+        channel = await client.channel_resolver.resolve(channel_id)
+        message = await client.message_resolver.resolve(channel, message_id)
         
         await message.add_reaction(emoji)
         return [TextContent(type="text", text=f"Added reaction {emoji} to message {message_id}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error adding reaction: {str(e)}")]
+        return failure(f"Error adding reaction: {str(e)}")
 
 @registry.register(
     name="remove_reaction",
@@ -42,7 +44,8 @@ async def add_reaction(arguments: dict):
             "user_id": {"type": "string", "description": "Optional: User ID to remove reaction from (default: self)"}
         },
         "required": ["channel_id", "message_id", "emoji"]
-    }
+    },
+    priority="interactive"
 )
 async def remove_reaction(arguments: dict):
     try:
@@ -51,8 +54,8 @@ async def remove_reaction(arguments: dict):
         emoji = arguments["emoji"]
         user_id = arguments.get("user_id")
         
-        channel = client.get_channel(channel_id) or await client.fetch_channel(channel_id)
-        message = await channel.fetch_message(message_id)
+        channel = await client.channel_resolver.resolve(channel_id)
+        message = await client.message_resolver.resolve(channel, message_id)
         
         if user_id:
             user = await client.fetch_user(int(user_id))
@@ -62,4 +65,4 @@ async def remove_reaction(arguments: dict):
             await message.remove_reaction(emoji, client.user)
             return [TextContent(type="text", text=f"Removed own reaction {emoji}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error removing reaction: {str(e)}")]
+        return failure(f"Error removing reaction: {str(e)}")
@@ -1,15 +1,139 @@
-from typing import Callable, Awaitable, Any
+import os
+import time
+import asyncio
+from typing import Callable, Awaitable, Any, Optional
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 import inspect
 
 ToolHandler = Callable[[dict], Awaitable[list[TextContent | ImageContent | EmbeddedResource]]]
 
+# Identifies the MCP session a tool call belongs to, for per-session tool state
+current_session: ContextVar[str] = ContextVar("current_session", default="default")
+
+# Name of the tool being run, for attributing REST calls and rate limit waits
+current_tool: ContextVar[Optional[str]] = ContextVar("current_tool", default=None)
+
+# REST priority class of the tool being run: interactive, normal or background
+current_priority: ContextVar[str] = ContextVar("current_priority", default="normal")
+
+
+class ToolFailure(list):
+    """Result of a tool call that failed. Handlers report failures as text
+    instead of raising; returning one of these (see failure()) is what
+    marks the call as failed in the metrics and to MCP clients."""
+
+
+def failure(text: str) -> ToolFailure:
+    return ToolFailure([TextContent(type="text", text=text)])
+
+
+class ToolScheduler:
+    """Runs tool calls concurrently up to a global in-flight cap, while
+    calls for the same channel (or message) run one at a time in arrival
+    order.
+
+    A call takes its slot before its resource key and never waits for a
+    slot while holding a key, so calls waiting for keys always hold slots
+    and cannot block the calls they wait on.
+    """
+
+    def __init__(self, max_in_flight: int = 16):
+        self.max_in_flight = max_in_flight
+        self.slots = asyncio.Semaphore(max_in_flight)
+        # resource key -> [lock, number of calls holding or waiting for it]
+        self.keys: dict[str, list] = {}
+        self.stats = {
+            "in_flight": 0,
+            "waiting_for_key": 0,
+            "waiting_for_slot": 0,
+            "max_queue_depth": 0,
+            "completed": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "ToolScheduler":
+        return cls(max_in_flight=int(os.getenv("TOOL_MAX_IN_FLIGHT", "16")))
+
+    @staticmethod
+    def resource_key(arguments: dict) -> Optional[str]:
+        if arguments.get("channel_id"):
+            return f"channel:{arguments['channel_id']}"
+        if arguments.get("message_id"):
+            return f"message:{arguments['message_id']}"
+        return None
+
+    def _queued(self, stat: str, delta: int):
+        self.stats[stat] += delta
+        depth = self.stats["waiting_for_key"] + self.stats["waiting_for_slot"]
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], depth)
+
+    @asynccontextmanager
+    async def key(self, key: Optional[str]):
+        """Hold the resource key for the duration of a call."""
+        if key is None:
+            yield
+            return
+        entry = self.keys.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            self._queued("waiting_for_key", 1)
+            try:
+                await entry[0].acquire()
+            finally:
+                self._queued("waiting_for_key", -1)
+            try:
+                yield
+            finally:
+                entry[0].release()
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self.keys[key]
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the global in-flight slots for the duration of a call."""
+        self._queued("waiting_for_slot", 1)
+        try:
+            await self.slots.acquire()
+        finally:
+            self._queued("waiting_for_slot", -1)
+        self.stats["in_flight"] += 1
+        try:
+            yield
+        finally:
+            self.stats["in_flight"] -= 1
+            self.stats["completed"] += 1
+            self.slots.release()
+
+
 class ToolRegistry:
     def __init__(self):
         self.tools: dict[str, Tool] = {}
         self.handlers: dict[str, ToolHandler] = {}
+        self.requires_ready: dict[str, bool] = {}
+        self.priorities: dict[str, str] = {}
+        self.waits: dict[str, bool] = {}
+        # Set once the gateway cache is populated; tools that need it wait on this
+        self.ready: Optional[asyncio.Event] = None
+        self.ready_timeout = float(os.getenv("READY_TIMEOUT", "30"))
+        self.scheduler = ToolScheduler.from_env()
+        # Records per-tool latency and outcomes when set
+        self.metrics = None
+        # Writes a span per tool call when set
+        self.tracer = None
 
-    def register(self, name: str, description: str, input_schema: dict):
+    def register(self, name: str, description: str, input_schema: dict, requires_ready: bool = True, priority: str = "normal", waits: bool = False):
+        """Register a tool. Tools that only make REST calls can pass
+        requires_ready=False to run before the gateway is READY. priority
+        is the REST priority class of the tool's requests: user-facing
+        actions are "interactive", bulk jobs "background". Tools that spend
+        most of a call waiting (long polls, profiling, batch_call waiting on
+        its nested calls) pass waits=True to run outside the scheduler, so
+        parked calls cannot starve the rest; calls they make are scheduled
+        like any other."""
         def decorator(func: ToolHandler):
             self.tools[name] = Tool(
                 name=name,
@@ -17,6 +141,9 @@ class ToolRegistry:
                 inputSchema=input_schema
             )
             self.handlers[name] = func
+            self.requires_ready[name] = requires_ready
+            self.priorities[name] = priority
+            self.waits[name] = waits
             return func
         return decorator
 
@@ -27,6 +154,41 @@ class ToolRegistry:
         handler = self.handlers.get(name)
         if not handler:
             raise ValueError(f"Tool {name} not found")
-        return await handler(arguments)
+
+        started = time.perf_counter()
+        ok = False
+        span = self.tracer.span("tool", tool=name, session=current_session.get()) if self.tracer else nullcontext()
+        try:
+            with span:
+                result = await self._run(name, handler, arguments)
+            ok = not isinstance(result, ToolFailure)
+            return result
+        finally:
+            if self.metrics:
+                self.metrics.observe_tool(name, time.perf_counter() - started, ok)
+
+    async def _run(self, name: str, handler: ToolHandler, arguments: dict):
+        # Nothing is held while waiting for READY; waiters are woken in
+        # arrival order, and take slots and keys in that order
+        if self.ready and self.requires_ready[name] and not self.ready.is_set():
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout=self.ready_timeout)
+            except asyncio.TimeoutError:
+                return failure(f"Discord connection not ready after {self.ready_timeout:g}s, try again shortly")
+        if self.waits[name]:
+            return await self._call(name, handler, arguments)
+        # Slot first, then key: see ToolScheduler
+        async with self.scheduler.slot():
+            async with self.scheduler.key(self.scheduler.resource_key(arguments)):
+                return await self._call(name, handler, arguments)
+
+    async def _call(self, name: str, handler: ToolHandler, arguments: dict):
+        token = current_tool.set(name)
+        priority_token = current_priority.set(self.priorities[name])
+        try:
+            return await handler(arguments)
+        finally:
+            current_priority.reset(priority_token)
+            current_tool.reset(token)
 
 registry = ToolRegistry()
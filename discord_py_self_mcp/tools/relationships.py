@@ -1,6 +1,6 @@
 import discord
 from mcp.types import TextContent
-from .registry import registry
+from .registry import registry, failure
 from ..bot import client
 
 @registry.register(
@@ -20,9 +20,9 @@ async def list_friends(arguments: dict):
         friend_list = [f"{f.name}#{f.discriminator} ({f.id})" for f in friends]
         return [TextContent(type="text", text="\n".join(friend_list))]
     except AttributeError:
-         return [TextContent(type="text", text="Client does not support friends list (or not logged in)")]
+         return failure("Client does not support friends list (or not logged in)")
     except Exception as e:
-        return [TextContent(type="text", text=f"Error listing friends: {str(e)}")]
+        return failure(f"Error listing friends: {str(e)}")
 
 @registry.register(
     name="send_friend_request",
@@ -30,7 +30,7 @@ async def list_friends(arguments: dict):
     input_schema={
         "type": "object",
         "properties": {
-            "username": {"type": "string"},
+            "username": {"type": "string", "description": "Username, case-insensitive; name#1234 is accepted for legacy tags"},
             "discriminator": {"type": "string", "description": "Optional if using new username system (0)"}
         },
         "required": ["username"]
@@ -41,27 +41,15 @@ async def send_friend_request(arguments: dict):
         username = arguments["username"]
         discriminator = arguments.get("discriminator")
         
-        # 1. Search in local cache (users shared in guilds)
-        target_user = None
-        for user in client.users:
-            if user.name == username:
-                if discriminator:
-                    if user.discriminator == discriminator:
-                        target_user = user
-                        break
-                else:
-                    # New username system or no discrim provided
-                    if user.discriminator == "0" or not discriminator:
-                        target_user = user
-                        break
-        
+        # 1. Look up users cached from shared guilds, DMs and friends
+        target_user = client.user_index.find(username, discriminator)
         if target_user:
             await target_user.send_friend_request()
             return [TextContent(type="text", text=f"Sent friend request to {target_user.name} (found in cache)")]
 
-        return [TextContent(type="text", text=f"User '{username}' not found in cached guilds. Please use 'add_friend' with their User ID.")]
+        return failure(f"User '{username}' not found in cached guilds. Please use 'add_friend' with their User ID.")
     except Exception as e:
-        return [TextContent(type="text", text=f"Error: {str(e)}")]
+        return failure(f"Error: {str(e)}")
 
 @registry.register(
     name="add_friend",
@@ -72,7 +60,8 @@ async def send_friend_request(arguments: dict):
             "user_id": {"type": "string"}
         },
         "required": ["user_id"]
-    }
+    },
+    requires_ready=False
 )
 async def add_friend(arguments: dict):
     try:
@@ -81,7 +70,7 @@ async def add_friend(arguments: dict):
         await user.send_friend_request()
         return [TextContent(type="text", text=f"Sent friend request to {user.name}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error adding friend: {str(e)}")]
+        return failure(f"Error adding friend: {str(e)}")
 
 @registry.register(
     name="remove_friend",
@@ -101,4 +90,4 @@ async def remove_friend(arguments: dict):
         await user.remove_friend()
         return [TextContent(type="text", text=f"Removed friend {user.name}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error removing friend: {str(e)}")]
+        return failure(f"Error removing friend: {str(e)}")
@@ -0,0 +1,126 @@
+import os
+import json
+from mcp.types import TextContent
+from .registry import registry, current_session, failure
+from ..bot import client
+from ..subscriptions import EVENT_TYPES
+
+MAX_POLL_WAIT = float(os.getenv("SUBSCRIPTION_MAX_WAIT", "30"))
+
+_ID_LIST = {"type": "array", "items": {"type": "string"}}
+
+
+@registry.register(
+    name="subscribe_messages",
+    description=(
+        "Subscribe to new messages (and optionally edits/deletes) matching channel, guild and author filters. "
+        "Events are buffered per subscription; read them with poll_subscription or by reading the returned "
+        "resource URI, and subscribe to the resource to be sent a resources/updated notification when new ones arrive"
+    ),
+    input_schema={
+        "type": "object",
+        "properties": {
+            "channel_ids": dict(_ID_LIST, description="Only events in these channels"),
+            "guild_ids": dict(_ID_LIST, description="Only events in these servers"),
+            "author_ids": dict(_ID_LIST, description="Only messages from these users"),
+            "events": {
+                "type": "array",
+                "items": {"type": "string", "enum": list(EVENT_TYPES)},
+                "default": ["message"],
+            },
+            "include_self": {
+                "type": "boolean",
+                "default": False,
+                "description": "Include messages sent by this account",
+            },
+            "buffer_size": {
+                "type": "integer",
+                "description": "Events kept until read; older events are dropped when full",
+            },
+        },
+    },
+    requires_ready=False,
+)
+async def subscribe_messages(arguments: dict):
+    try:
+        subscription = client.subscriptions.subscribe(
+            current_session.get(),
+            channel_ids=[int(i) for i in arguments.get("channel_ids") or []],
+            guild_ids=[int(i) for i in arguments.get("guild_ids") or []],
+            author_ids=[int(i) for i in arguments.get("author_ids") or []],
+            events=arguments.get("events") or ["message"],
+            include_self=arguments.get("include_self", False),
+            buffer_size=arguments.get("buffer_size"),
+        )
+        return [TextContent(type="text", text=json.dumps(subscription.describe()))]
+    except Exception as e:
+        return failure(f"Error subscribing: {str(e)}")
+
+
+@registry.register(
+    name="poll_subscription",
+    description="Return buffered events for a subscription, oldest first, optionally waiting for the next one",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "subscription_id": {"type": "string"},
+            "max_events": {"type": "integer", "default": 100},
+            "wait_seconds": {
+                "type": "number",
+                "default": 0,
+                "description": f"Wait up to this long (max {MAX_POLL_WAIT:g}) when nothing is buffered",
+            },
+        },
+        "required": ["subscription_id"],
+    },
+    requires_ready=False,
+    waits=True,
+)
+async def poll_subscription(arguments: dict):
+    try:
+        result = await client.subscriptions.read(
+            arguments["subscription_id"],
+            current_session.get(),
+            max_events=max(1, arguments.get("max_events", 100)),
+            wait=min(float(arguments.get("wait_seconds", 0)), MAX_POLL_WAIT),
+        )
+        return [TextContent(type="text", text=json.dumps(result))]
+    except Exception as e:
+        return failure(f"Error polling subscription: {str(e)}")
+
+
+@registry.register(
+    name="unsubscribe_messages",
+    description="Remove a message subscription",
+    input_schema={
+        "type": "object",
+        "properties": {"subscription_id": {"type": "string"}},
+        "required": ["subscription_id"],
+    },
+    requires_ready=False,
+)
+async def unsubscribe_messages(arguments: dict):
+    try:
+        subscription = client.subscriptions.unsubscribe(arguments["subscription_id"], current_session.get())
+        return [
+            TextContent(
+                type="text",
+                text=f"Removed subscription {subscription.id} ({len(subscription.buffer)} unread events discarded)",
+            )
+        ]
+    except Exception as e:
+        return failure(f"Error unsubscribing: {str(e)}")
+
+
+@registry.register(
+    name="list_subscriptions",
+    description="List this session's message subscriptions with their filters and buffer state",
+    input_schema={"type": "object", "properties": {}},
+    requires_ready=False,
+)
+async def list_subscriptions(arguments: dict):
+    try:
+        subscriptions = client.subscriptions.for_session(current_session.get())
+        return [TextContent(type="text", text=json.dumps([s.describe() for s in subscriptions]))]
+    except Exception as e:
+        return failure(f"Error listing subscriptions: {str(e)}")
@@ -1,6 +1,6 @@
 import discord
 from mcp.types import TextContent
-from .registry import registry
+from .registry import registry, failure
 from ..bot import client
 
 @registry.register(
@@ -14,7 +14,8 @@ from ..bot import client
             "message_id": {"type": "string", "description": "Optional message to start thread from"}
         },
         "required": ["channel_id", "name"]
-    }
+    },
+    requires_ready=False
 )
 async def create_thread(arguments: dict):
     try:
@@ -22,16 +23,24 @@ async def create_thread(arguments: dict):
         name = arguments["name"]
         message_id = arguments.get("message_id")
         
-        channel = client.get_channel(channel_id) or await client.fetch_channel(channel_id)
+        channel = await client.channel_resolver.resolve(channel_id)
+
+        # Threads from a message are public; text channels otherwise create
+        # private ones
+        if isinstance(channel, discord.TextChannel):
+            needed = "create_public_threads" if message_id else "create_private_threads"
+            denied = client.permissions.check(channel, "view_channel", needed)
+            if denied:
+                return failure(denied)
         
         message = None
         if message_id:
-            message = await channel.fetch_message(int(message_id))
+            message = await client.message_resolver.resolve(channel, int(message_id))
             
         thread = await channel.create_thread(name=name, message=message)
         return [TextContent(type="text", text=f"Created thread {thread.name} ({thread.id})")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error creating thread: {str(e)}")]
+        return failure(f"Error creating thread: {str(e)}")
 
 @registry.register(
     name="archive_thread",
@@ -43,18 +52,19 @@ async def create_thread(arguments: dict):
             "archived": {"type": "boolean"}
         },
         "required": ["thread_id", "archived"]
-    }
+    },
+    requires_ready=False
 )
 async def archive_thread(arguments: dict):
     try:
         thread_id = int(arguments["thread_id"])
         archived = arguments["archived"]
         
-        thread = client.get_channel(thread_id) or await client.fetch_channel(thread_id)
+        thread = await client.channel_resolver.resolve(thread_id)
         if not isinstance(thread, discord.Thread):
-            return [TextContent(type="text", text="Channel is not a thread")]
+            return failure("Channel is not a thread")
             
         await thread.edit(archived=archived)
         return [TextContent(type="text", text=f"Set thread archived={archived}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error editing thread: {str(e)}")]
+        return failure(f"Error editing thread: {str(e)}")
@@ -1,6 +1,6 @@
 import discord
 from mcp.types import TextContent
-from .registry import registry
+from .registry import registry, failure
 from ..bot import client
 
 @registry.register(
@@ -19,15 +19,15 @@ async def join_voice_channel(arguments: dict):
         channel_id = int(arguments["channel_id"])
         channel = client.get_channel(channel_id)
         if not channel:
-            return [TextContent(type="text", text="Channel not found")]
+            return failure("Channel not found")
         
         if not isinstance(channel, discord.VoiceChannel):
-             return [TextContent(type="text", text="Channel is not a voice channel")]
+             return failure("Channel is not a voice channel")
 
         await channel.connect()
         return [TextContent(type="text", text=f"Joined voice channel {channel.name}")]
     except Exception as e:
-        return [TextContent(type="text", text=f"Error joining voice channel: {str(e)}")]
+        return failure(f"Error joining voice channel: {str(e)}")
 
 @registry.register(
     name="leave_voice_channel",
@@ -45,12 +45,12 @@ async def leave_voice_channel(arguments: dict):
         guild_id = int(arguments["guild_id"])
         guild = client.get_guild(guild_id)
         if not guild:
-            return [TextContent(type="text", text="Guild not found")]
+            return failure("Guild not found")
         
         if guild.voice_client:
             await guild.voice_client.disconnect()
             return [TextContent(type="text", text=f"Left voice channel in {guild.name}")]
         else:
-            return [TextContent(type="text", text="Not in a voice channel in this guild")]
+            return failure("Not in a voice channel in this guild")
     except Exception as e:
-        return [TextContent(type="text", text=f"Error leaving voice channel: {str(e)}")]
+        return failure(f"Error leaving voice channel: {str(e)}")
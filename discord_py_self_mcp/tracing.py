@@ -0,0 +1,108 @@
+import os
+import json
+import time
+import random
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+from .paths import data_dir
+
+logger = logging.getLogger(__name__)
+
+# Marks a trace whose root span was not sampled, so its children are skipped too
+_UNSAMPLED = {}
+
+_current_span: ContextVar[Optional[dict]] = ContextVar("_current_span", default=None)
+
+
+class Tracer:
+    """Writes span-style traces as JSONL, one line per finished span.
+
+    A span opened while no other span is active starts a new trace, which
+    is kept with probability sample_rate. Spans record their trace and
+    parent ids, wall-clock start, duration and attributes, so a slow tool
+    call can be split into channel resolution, REST requests and the time
+    the handler spent on its own (e.g. formatting).
+    """
+
+    def __init__(self, path: Optional[Path] = None, sample_rate: float = 1.0):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.file = None
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        path = os.getenv("TRACE_FILE")
+        if not path and os.getenv("TRACING", "false").lower() in ("1", "true", "on"):
+            path = str(data_dir() / "traces.jsonl")
+        return cls(
+            Path(path) if path else None,
+            sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "1.0")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time the enclosed block as a span; yields the span's attribute
+        dict (or None when not traced) so callers can add to it."""
+        parent = _current_span.get()
+        if not self.enabled or parent is _UNSAMPLED:
+            yield None
+            return
+        if parent is None and random.random() >= self.sample_rate:
+            token = _current_span.set(_UNSAMPLED)
+            try:
+                yield None
+            finally:
+                _current_span.reset(token)
+            return
+
+        span = {
+            "trace_id": parent["trace_id"] if parent else os.urandom(8).hex(),
+            "span_id": os.urandom(8).hex(),
+            "parent_id": parent["span_id"] if parent else None,
+            "name": name,
+            "start": time.time(),
+            "duration_ms": 0.0,
+            "attributes": attributes,
+        }
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield attributes
+        except BaseException as e:
+            span["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            _current_span.reset(token)
+            self._write(span)
+
+    def _write(self, span: dict):
+        try:
+            if self.file is None:
+                self.file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self.file.write(json.dumps(span, default=str, separators=(",", ":")) + "\n")
+        except OSError as e:
+            logger.warning(f"Tracing disabled, could not write to {self.path}: {e}")
+            self.path = None
+
+    def install(self, http):
+        """Wrap the HTTP client's request method in a span per REST request."""
+        request = http.request
+
+        async def traced_request(route, **kwargs):
+            with self.span("rest", route=route.key):
+                return await request(route, **kwargs)
+
+        http.request = traced_request
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
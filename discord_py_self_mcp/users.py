@@ -0,0 +1,100 @@
+from typing import Optional
+import discord
+
+
+def split_tag(username: str, discriminator: Optional[str] = None) -> tuple[str, Optional[str]]:
+    """Accept "name", "name#1234" or a separate discriminator; "0" and
+    "#0" mean the new username system."""
+    name, sep, tag = username.rpartition("#")
+    if sep and tag.isdigit() and not discriminator:
+        username, discriminator = name, tag
+    return username, discriminator or None
+
+
+class UserIndex:
+    """Username -> user id index over the gateway's user cache, so tools
+    can resolve usernames without scanning client.users.
+
+    Names are case-folded. Users on the new username system (discriminator
+    "0") are keyed by name alone, legacy users by name and discriminator.
+    Only ids are stored: the user cache holds users weakly, so entries are
+    checked against it on lookup and dropped once the user is gone or
+    renamed, and the index is rebuilt when stale entries pile up.
+    """
+
+    def __init__(self):
+        self.state = None
+        self.names: dict[str, int] = {}
+        self.tagged: dict[tuple[str, str], int] = {}
+        # Legacy users by name alone, for lookups without a discriminator
+        self.tagged_names: dict[str, int] = {}
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "rebuilds": 0}
+
+    def install(self, state):
+        """Index every user the connection stores, from READY, members,
+        messages and any other payload that carries one."""
+        self.state = state
+        store_user = state.store_user
+
+        def indexed_store_user(data):
+            user = store_user(data)
+            self.add(user)
+            return user
+
+        state.store_user = indexed_store_user
+
+    def __len__(self) -> int:
+        return len(self.names) + len(self.tagged) + len(self.tagged_names)
+
+    def _index(self, user: discord.abc.User):
+        # Webhook authors ("0000") are never cached as users
+        if user.discriminator == "0000":
+            return
+        name = user.name.casefold()
+        if user.discriminator == "0":
+            self.names[name] = user.id
+        else:
+            self.tagged[(name, user.discriminator)] = user.id
+            self.tagged_names[name] = user.id
+
+    def add(self, user: discord.abc.User):
+        self._index(user)
+        if self.state is not None and len(self) > 2 * len(self.state._users) + 1024:
+            self.rebuild()
+
+    def rebuild(self):
+        self.names.clear()
+        self.tagged.clear()
+        self.tagged_names.clear()
+        self.stats["rebuilds"] += 1
+        for user in list(self.state._users.values()):
+            self._index(user)
+
+    def _get(self, table: dict, key, name: str, discriminator: Optional[str]) -> Optional[discord.User]:
+        user_id = table.get(key)
+        if user_id is None:
+            return None
+        user = self.state.get_user(user_id) if self.state is not None else None
+        if (
+            user is None
+            or user.name.casefold() != name
+            or (discriminator is not None and user.discriminator != discriminator)
+        ):
+            del table[key]
+            self.stats["stale"] += 1
+            return None
+        return user
+
+    def find(self, username: str, discriminator: Optional[str] = None) -> Optional[discord.User]:
+        """Return the cached user with this username (and discriminator,
+        if given), or None."""
+        username, discriminator = split_tag(username, discriminator)
+        name = username.casefold()
+        if discriminator in (None, "0"):
+            user = self._get(self.names, name, name, None)
+            if user is None and discriminator is None:
+                user = self._get(self.tagged_names, name, name, None)
+        else:
+            user = self._get(self.tagged, (name, discriminator), name, discriminator)
+        self.stats["hits" if user else "misses"] += 1
+        return user
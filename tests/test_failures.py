@@ -0,0 +1,41 @@
+import asyncio
+import json
+import pytest
+from mcp.types import TextContent
+from discord_py_self_mcp.tools import registry
+from discord_py_self_mcp.tools.registry import ToolFailure, failure
+
+
+@pytest.fixture
+def echo():
+    """A tool that returns its text argument, as a failure when asked to."""
+
+    async def handler(arguments: dict):
+        if arguments.get("fail"):
+            return failure(arguments["text"])
+        return [TextContent(type="text", text=arguments["text"])]
+
+    registry.register("_test_echo", "test tool", {"type": "object"}, requires_ready=False)(handler)
+    yield
+    for table in (registry.tools, registry.handlers, registry.requires_ready, registry.priorities, registry.waits):
+        table.pop("_test_echo", None)
+
+
+def test_failures_are_flagged_by_the_handler_not_by_text(echo):
+    # Message content that happens to read like an error is still a success
+    content = "Error: build failed, see #ci"
+    calls = [
+        {"name": "_test_echo", "arguments": {"text": content}},
+        {"name": "_test_echo", "arguments": {"text": "Channel not found", "fail": True}},
+    ]
+
+    async def run():
+        direct = await registry.call_tool("_test_echo", {"text": content})
+        batch = await registry.call_tool("batch_call", {"calls": calls})
+        return direct, batch
+
+    direct, batch = asyncio.run(run())
+    assert not isinstance(direct, ToolFailure)
+    results = json.loads(batch[0].text)["results"]
+    assert results[0] == {"name": "_test_echo", "result": content}
+    assert results[1] == {"name": "_test_echo", "error": "Channel not found"}
@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from mcp.types import TextContent
+from discord_py_self_mcp.tools import registry
+from discord_py_self_mcp.tools.registry import ToolScheduler
+
+
+@pytest.fixture
+def scheduled():
+    """A tool that records how many of its calls run at once, registered
+    for the test, and a fresh scheduler with the given cap."""
+    state = {"running": 0, "peak": 0}
+
+    async def handler(arguments: dict):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.01)
+        state["running"] -= 1
+        return [TextContent(type="text", text="ok")]
+
+    registry.register("_test_read", "test tool", {"type": "object"}, requires_ready=False)(handler)
+    scheduler = registry.scheduler
+
+    def use(max_in_flight: int) -> ToolScheduler:
+        registry.scheduler = ToolScheduler(max_in_flight=max_in_flight)
+        return registry.scheduler
+
+    yield state, use
+    registry.scheduler = scheduler
+    for table in (registry.tools, registry.handlers, registry.requires_ready, registry.priorities, registry.waits):
+        table.pop("_test_read", None)
+
+
+def _batch(*calls: dict):
+    return registry.call_tool("batch_call", {"calls": list(calls)})
+
+
+@pytest.mark.parametrize("max_in_flight", [1, 16])
+def test_batches_and_calls_on_one_channel_do_not_deadlock(scheduled, max_in_flight):
+    _, use = scheduled
+    scheduler = use(max_in_flight)
+    read = {"name": "_test_read", "arguments": {"channel_id": "1"}}
+
+    async def run():
+        # Every slot taken by a batch whose nested call needs the channel
+        # key, plus a top-level call on the same channel
+        calls = [_batch(read) for _ in range(max_in_flight)]
+        calls.append(registry.call_tool("_test_read", {"channel_id": "1"}))
+        return await asyncio.wait_for(asyncio.gather(*calls), timeout=5)
+
+    results = asyncio.run(run())
+    assert len(results) == max_in_flight + 1
+    assert scheduler.stats["in_flight"] == 0
+    # The batches themselves take no slot; their nested calls do
+    assert scheduler.stats["completed"] == max_in_flight + 1
+
+
+def test_nested_calls_count_against_the_in_flight_cap(scheduled):
+    state, use = scheduled
+    use(2)
+    calls = [{"name": "_test_read", "arguments": {"channel_id": str(i)}} for i in range(10)]
+
+    async def run():
+        await asyncio.wait_for(
+            asyncio.gather(
+                registry.call_tool("batch_call", {"calls": calls, "max_concurrency": 8}),
+                registry.call_tool("batch_call", {"calls": calls, "max_concurrency": 8}),
+                registry.call_tool("_test_read", {"channel_id": "100"}),
+            ),
+            timeout=5,
+        )
+
+    asyncio.run(run())
+    assert state["peak"] == 2